@@ -0,0 +1,90 @@
+#!/usr/bin/python
+
+"""
+Checks and benchmarks the record of products that aren't installed, on a synthetic Mac (see Fixtures.py).
+A cold run searches Spotlight for every product; a repeat run must spawn no subprocesses at all and give the same results.
+Installing a missing product must be noticed by the next run, as must the record expiring, and a failed Spotlight search must not be recorded.
+When the recorded Spotlight status expires, products racing to read it must run mdutil once between them; failures are printed and fail the run.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from os.path import join
+from shutil import rmtree
+from sys import exit
+from tempfile import mkdtemp
+from time import time
+from Fixtures import add_bundle, build, info_plist, install, installed, reset, write_executable
+from casper import cache, command
+from casper.runner import run
+from Spotlight import Spawned, counting
+
+# Time a run, returning seconds, subprocesses spawned and results
+def measure(Products):
+	reset()
+	del Spawned[:]
+	t = time()
+	r = run(Products)
+	return time() - t, len(Spawned), r
+
+def main():
+	parser = ArgumentParser(description='Checks and benchmarks the record of products that are not installed.')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-absent-')
+	Failed = []
+	try:
+		Fixture = build(root, apps=args.apps)
+		Products = Fixture['Products']
+		install(root)
+		command.Popen = counting(command.Popen)
+		cold, a, r1 = measure(Products)
+		warm, b, r2 = measure(Products)
+		print('products:             %d, %d not applicable' % (len(Products), list(r1.values()).count('N/A')))
+		print('cold run:             %.3fs, %d subprocesses' % (cold, a))
+		print('repeat run:           %.3fs, %d subprocesses' % (warm, b))
+		if (b != 0): Failed.append('repeat run spawned %d subprocesses' % b)
+		if (r1 != r2): Failed.append('repeat run gave different results')
+		# Install a product that was missing
+		p = [p for n, p in enumerate(Products) if p['Template'] == 'BUNDLE' and installed(p, n) is None][0]
+		add_bundle(root, root + '/Applications/' + p['Name'] + '.app', info_plist(p['CFBundleIdentifier'].replace('*', '0'), p['Version']))
+		t, c, r3 = measure(Products)
+		print('after an install:     %.3fs, %d subprocesses, %s: %s' % (t, c, p['Name'], r3[p['Name']]))
+		if (r1[p['Name']] != 'N/A' or r3[p['Name']] != 'Equal'): Failed.append('installed product went from %s to %s' % (r1[p['Name']], r3[p['Name']]))
+		# Expire the record
+		cache.MaxAbsent = 0
+		t, d, r4 = measure(Products)
+		cache.MaxAbsent = 86400
+		print('after it expires:     %.3fs, %d subprocesses' % (t, d))
+		if (d == 0 or r4 != r3): Failed.append('expired record spawned %d subprocesses' % d)
+		# Expire the Spotlight status
+		cache.MaxStatus = 0
+		t, g, r7 = measure(Products)
+		cache.MaxStatus = 3600
+		Mdutil = len([c for c in Spawned if c[0].endswith('mdutil')])
+		print('expired status:       %.3fs, %d subprocesses, mdutil run %d times' % (t, g, Mdutil))
+		if (Mdutil != 1 or r7 != r4): Failed.append('expired status ran mdutil %d times' % Mdutil)
+		# Fail a cold run's Spotlight search, as a timed out or crashed mdfind would
+		Mdfind = join(root, 'usr', 'bin', 'mdfind')
+		with open(Mdfind) as i:
+			s = i.read()
+		reset(root)
+		write_executable(Mdfind, '#!/bin/sh\nexit 1\n')
+		t, e, r5 = measure(Products)
+		write_executable(Mdfind, s)
+		Errors = [n for n in r5 if r5[n] == 'Error: Spotlight search failed']
+		print('failed search:        %.3fs, %d subprocesses, %d products failed' % (t, e, len(Errors)))
+		if (len(Errors) == 0 or [n for n in r5 if r5[n] != r4[n] and not n in Errors]): Failed.append('failed search gave %d errors and %d other changed results' % (len(Errors), len([n for n in r5 if r5[n] != r4[n] and not n in Errors])))
+		t, f, r6 = measure(Products)
+		print('next run:             %.3fs, %d subprocesses' % (t, f))
+		if (r6 != r4): Failed.append('run after a failed search gave different results, %d differ' % len([n for n in r6 if r6[n] != r4[n]]))
+	finally:
+		rmtree(root)
+	for e in Failed:
+		print('failed: ' + e)
+	print('checks:               %s' % ('failed' if Failed else 'passed'))
+	if (Failed):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
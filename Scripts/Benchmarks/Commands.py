@@ -0,0 +1,82 @@
+#!/usr/bin/python
+
+"""
+Checks and benchmarks the cached command source of the CMD template with stub executables that count their invocations (see Fixtures.py).
+A stub is run through the cache repeatedly, then after its binary changes, after its cached output expires and with a timeout shorter than it runs for.
+Each case must invoke the stub the expected number of times; failures are printed and fail the run.
+Also reports the time per result through '/bin/bash -c', as the template used to run commands, and through the cache.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from os import utime
+from shutil import rmtree
+from sys import exit
+from tempfile import mkdtemp
+from time import time
+from Fixtures import install, invocations, write_stub
+from casper import command
+
+# Clear the cache loaded in memory, as a new run would start
+def new_run():
+	command.Cached.clear()
+
+def main():
+	parser = ArgumentParser(description='Checks and benchmarks cached command output with counting stubs.')
+	parser.add_argument('--runs', type=int, default=20, help='runs to read each result for')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-commands-')
+	Failed = []
+	try:
+		install(root)
+		f = write_stub(root + '/Library/McAfee/agent/bin/msaconfig', '5.0.2.132')
+		# Repeated runs invoke the stub once
+		for i in range(args.runs):
+			new_run()
+			v = command.read_command(f, ['-version'])
+		if (v != '5.0.2.132' or invocations(f) != 1): Failed.append('cached runs invoked the stub %d times, read %r' % (invocations(f), v))
+		# Different arguments are cached separately
+		new_run()
+		command.read_command(f)
+		if (invocations(f) != 2): Failed.append('other arguments invoked the stub %d times in total' % invocations(f))
+		# A changed binary is run again
+		utime(f, (time() + 10, time() + 10))
+		new_run()
+		command.read_command(f, ['-version'])
+		if (invocations(f) != 3): Failed.append('changed binary invoked the stub %d times in total' % invocations(f))
+		# Expired output is run again
+		command.MaxAge = 0
+		new_run()
+		command.read_command(f, ['-version'])
+		command.MaxAge = 86400
+		if (invocations(f) != 4): Failed.append('expired output invoked the stub %d times in total' % invocations(f))
+		# A command running past its timeout is stopped, and its empty output isn't cached
+		s = write_stub(root + '/usr/local/bin/slow', '1.0', 5)
+		t = time()
+		v = command.read_command(s, [], 1)
+		t = time() - t
+		if (v != '' or t > 3): Failed.append('slow command returned %r after %.1fs' % (v, t))
+		if (command.Cached.get(s) is not None): Failed.append('slow command output was cached')
+		# Time per result through a shell and through the cache
+		b = write_stub(root + '/usr/local/bin/bench', '1.0')
+		t = time()
+		for i in range(args.runs):
+			command.execute_command(['/bin/bash', '-c', b])
+		shell = (time() - t) / args.runs
+		t = time()
+		for i in range(args.runs):
+			new_run()
+			command.read_command(b)
+		cached = (time() - t) / args.runs
+		print('through a shell:      %.2fms per result' % (1000 * shell))
+		print('through the cache:    %.2fms per result, %d invocations in %d runs' % (1000 * cached, invocations(b) - args.runs, args.runs))
+	finally:
+		rmtree(root)
+	for e in Failed:
+		print('failed: ' + e)
+	print('checks:               %s' % ('failed' if Failed else 'passed'))
+	if (Failed):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,51 @@
+#!/usr/bin/python
+
+"""
+Benchmarks the filesystem crawler on a synthetic Mac (see Fixtures.py), with a large tree of folders with bundles scattered through it in /Library.
+The tree is crawled with different numbers of worker threads, reporting the time and folders listed per second.
+It is then crawled again from a saved bundle index, unchanged and with one bundle added, to show the cost of an incremental crawl.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+from Fixtures import add_bundle, build, info_plist, install
+from casper import cache, crawler
+from casper.crawler import crawl
+
+def main():
+	parser = ArgumentParser(description='Benchmarks the filesystem crawler on a synthetic tree.')
+	parser.add_argument('--folders', type=int, default=100000, help='approximate number of folders in the tree')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	parser.add_argument('--workers', type=int, action='append', help='worker threads to crawl with (repeatable)')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-crawler-')
+	try:
+		t = time()
+		folders = build(root, apps=args.apps, folders=args.folders)['Folders']
+		install(root)
+		print('built %d folders in %.1fs' % (folders, time() - t))
+		for workers in args.workers or [1, 4, 8, 16]:
+			cache.State.clear()
+			t = time()
+			Index = crawl(crawler.Roots, workers)
+			t = time() - t
+			print('%2d workers: %.3fs, %d folders/s, %d bundles indexed' % (workers, t, folders / t, sum(len(a) for a in Index.values())))
+		# Crawl again from a saved index, as the next run would
+		cache.save()
+		for label in ('unchanged', 'one bundle added'):
+			if (label != 'unchanged'):
+				add_bundle(root, root + '/Applications/Added.app', info_plist('com.example.added', '1.0'))
+			cache.State.clear()
+			t = time()
+			Index = crawl(crawler.Roots)
+			t = time() - t
+			print('from index, %s: %.3fs, %d entries changed, %d bundles indexed' % (label, t, len(cache.Changed), sum(len(a) for a in Index.values())))
+			cache.save()
+	finally:
+		rmtree(root)
+
+if __name__ == '__main__':
+	main()
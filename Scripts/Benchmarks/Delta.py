@@ -0,0 +1,105 @@
+#!/usr/bin/python
+
+"""
+Checks and benchmarks delta runs, which only evaluate the products whose inputs changed, on a synthetic Mac (see Fixtures.py).
+A first run evaluates every product; a repeat run must evaluate none, spawn no subprocesses and give the same results.
+Changing a plist, installing a missing product or changing a product's definition must evaluate it again, as must the state being due a full evaluation; every delta run must give the results of a full run, and failures are printed and fail the run.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from shutil import rmtree
+from sys import exit
+from tempfile import mkdtemp
+from time import time
+from Fixtures import add_bundle, build, info_plist, install, installed, reset, write_plist
+from casper import command, delta, runner
+from Spotlight import Spawned, counting
+
+# Products evaluated by each run
+Evaluated = []
+
+# Count the products a delta run evaluates
+def evaluating(f):
+	def run(Products, *args, **kwargs):
+		Evaluated.append(len(Products))
+		return f(Products, *args, **kwargs)
+	return run
+
+# Time a delta run, returning seconds, products evaluated, subprocesses spawned and results
+def measure(Products):
+	reset()
+	del Evaluated[:]
+	del Spawned[:]
+	t = time()
+	r = runner.run_delta(Products)
+	return time() - t, sum(Evaluated), len(Spawned), r
+
+# Results of a full run, to check a delta run against
+def full(Products):
+	reset()
+	r = Evaluate(Products)
+	return r
+
+# The full evaluation, before it is counted
+Evaluate = runner.run
+
+def main():
+	parser = ArgumentParser(description='Checks and benchmarks delta runs.')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-delta-')
+	Failed = []
+	try:
+		Fixture = build(root, apps=args.apps)
+		Products = Fixture['Products']
+		install(root)
+		reset(root)
+		command.Popen = counting(command.Popen)
+		runner.run = evaluating(runner.run)
+		# A first run evaluates every product, and a repeat run none
+		t, a, s, r1 = measure(Products)
+		print('products:             %d' % len(Products))
+		print('first run:            %.3fs, %d evaluated, %d subprocesses' % (t, a, s))
+		if (a != len(Products)): Failed.append('first run evaluated %d products' % a)
+		if (r1 != full(Products)): Failed.append('first run gave different results from a full run')
+		t, a, s, r2 = measure(Products)
+		print('repeat run:           %.3fs, %d evaluated, %d subprocesses' % (t, a, s))
+		if (a != 0 or s != 0): Failed.append('repeat run evaluated %d products, spawning %d subprocesses' % (a, s))
+		if (r2 != r1): Failed.append('repeat run gave different results')
+		# Update a plist product that was older
+		n, p = [(n, p) for n, p in enumerate(Products) if p['Template'] == 'PLIST' and installed(p, n) != p['Version'] and installed(p, n) is not None][0]
+		write_plist({p['Key']: p['Version']}, p['Plist'], n % 2 == 0)
+		t, a, s, r3 = measure(Products)
+		print('after a plist change: %.3fs, %d evaluated, %s: %s' % (t, a, p['Name'], r3[p['Name']]))
+		if (a == 0 or a == len(Products) or r3[p['Name']] != 'Equal'): Failed.append('changed plist evaluated %d products, %s went from %s to %s' % (a, p['Name'], r2[p['Name']], r3[p['Name']]))
+		if (r3 != full(Products)): Failed.append('delta run after a plist change gave different results from a full run')
+		# Install a product that was missing
+		n, p = [(n, p) for n, p in enumerate(Products) if p['Template'] == 'BUNDLE' and installed(p, n) is None][0]
+		add_bundle(root, root + '/Applications/' + p['Name'] + '.app', info_plist(p['CFBundleIdentifier'].replace('*', '0'), p['Version']))
+		t, a, s, r4 = measure(Products)
+		print('after an install:     %.3fs, %d evaluated, %s: %s' % (t, a, p['Name'], r4[p['Name']]))
+		if (a == 0 or a == len(Products) or r4[p['Name']] != 'Equal'): Failed.append('install evaluated %d products, %s went from %s to %s' % (a, p['Name'], r3[p['Name']], r4[p['Name']]))
+		if (r4 != full(Products)): Failed.append('delta run after an install gave different results from a full run')
+		# Raise the version a product expects
+		Changed = [dict(p, Version=p['Version'] + '.1') if p['Name'] == Products[0]['Name'] else p for p in Products]
+		t, a, s, r5 = measure(Changed)
+		print('after a definition:   %.3fs, %d evaluated, %s: %s' % (t, a, Products[0]['Name'], r5[Products[0]['Name']]))
+		if (a != 1): Failed.append('changed definition evaluated %d products' % a)
+		if (r5 != full(Changed)): Failed.append('delta run after a definition change gave different results from a full run')
+		# Come due a full evaluation
+		delta.Refresh = -1
+		t, a, s, r6 = measure(Changed)
+		delta.Refresh = 86400
+		print('full refresh:         %.3fs, %d evaluated, %d subprocesses' % (t, a, s))
+		if (a != len(Products) or r6 != r5): Failed.append('full refresh evaluated %d products' % a)
+	finally:
+		rmtree(root)
+	for e in Failed:
+		print('failed: ' + e)
+	print('checks:               %s' % ('failed' if Failed else 'passed'))
+	if (Failed):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
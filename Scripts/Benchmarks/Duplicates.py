@@ -0,0 +1,94 @@
+#!/usr/bin/python
+
+"""
+Checks that every bundle is read once per run, however many paths lead to it, on a synthetic Mac (see Fixtures.py).
+The fixture is given a firmlink-style symlink to its whole root, as /System/Volumes/Data is to the data volume, which Spotlight reports every bundle through a second time and the crawler crawls as a second root.
+Symlinked aliases of bundles are added to the Spotlight results, and symlink loops to the application folders.
+With Spotlight and with the crawler, the results must match those without the duplicates, and no Info.plist key may be read twice; failures are printed and fail the run.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from json import dumps, loads
+from os import makedirs, stat, symlink
+from os.path import join
+from shutil import rmtree
+from sys import exit
+from tempfile import mkdtemp
+from time import time
+from Fixtures import build, install, reset, write_file
+from casper import bundles, cache, crawler
+from casper.runner import run
+
+# Info.plist keys read, by the device and inode of the Info.plist
+Reads = []
+def counting(read_plist):
+	def wrapper(p, k):
+		s = stat(p)
+		Reads.append((s.st_dev, s.st_ino, k))
+		return read_plist(p, k)
+	return wrapper
+
+# Add second paths to every bundle, and symlink loops, returning the path through which the root is reached again
+def add_duplicates(root, Written, aliases):
+	Data = join(root, 'System', 'Volumes', 'Data')
+	makedirs(join(root, 'System', 'Volumes'))
+	symlink(root, Data)
+	symlink(join(root, 'Applications'), join(root, 'Applications', 'Loop'))
+	symlink(join(root, 'Applications', 'Loop B'), join(root, 'Applications', 'Loop A'))
+	symlink(join(root, 'Applications', 'Loop A'), join(root, 'Applications', 'Loop B'))
+	Entries = [(Data + Bundle[len(root):], id) for Bundle, id in Written]
+	for i, (Bundle, id) in enumerate([e for e in Written if e[0].endswith('.app')][:aliases]):
+		symlink(Bundle, join(root, 'Applications', 'Alias %d.app' % i))
+		Entries.append((join(root, 'Applications', 'Alias %d.app' % i), id))
+	f = join(root, 'usr', 'share', 'mdfind.json')
+	with open(f) as i:
+		write_file(f, dumps(loads(i.read()) + Entries))
+	return Data
+
+# Time a cold run with a discovery backend, returning seconds, results and the Info.plist keys read more than once
+def measure(root, Products, backend):
+	reset(root)
+	del Reads[:]
+	bundles.Backend = backend
+	t = time()
+	r = run(Products)
+	t = time() - t
+	Twice = len(Reads) - len(set(Reads))
+	return t, r, Twice
+
+def main():
+	parser = ArgumentParser(description='Checks that every bundle is read once per run, however many paths lead to it.')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	parser.add_argument('--aliases', type=int, default=50, help='symlinked aliases of bundles added to the Spotlight results')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-duplicates-')
+	Failed = []
+	cache.read_plist = counting(cache.read_plist)
+	try:
+		Fixture = build(root, apps=args.apps)
+		Products = Fixture['Products']
+		install(root)
+		Before = dict((b, measure(root, Products, b)) for b in ('spotlight', 'crawler'))
+		Data = add_duplicates(root, Fixture['Bundles'], args.aliases)
+		crawler.Roots.append(Data + '/Applications')
+		After = dict((b, measure(root, Products, b)) for b in ('spotlight', 'crawler'))
+		Paths = len(set(Bundle for id in bundles.Found for Bundle in bundles.Found[id]))
+	finally:
+		bundles.Backend = 'auto'
+		rmtree(root)
+	print('products:              %d' % len(Products))
+	print('bundles found:         %d paths, %d duplicates added' % (Paths, len(Fixture['Bundles']) + args.aliases))
+	for b in ('spotlight', 'crawler'):
+		print('%-22s %.3fs, %.3fs with duplicates, %d keys read twice' % (b + ':', Before[b][0], After[b][0], After[b][2]))
+		if (After[b][2]): Failed.append('%s read %d Info.plist keys twice' % (b, After[b][2]))
+		for n in sorted(Before[b][1]):
+			if (Before[b][1][n] != After[b][1][n]): Failed.append('%s: %s went from %s to %s' % (b, n, Before[b][1][n], After[b][1][n]))
+	for e in Failed:
+		print('failed: ' + e)
+	print('checks:                %s' % ('failed' if Failed else 'passed'))
+	if (Failed):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
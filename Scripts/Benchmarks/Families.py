@@ -0,0 +1,124 @@
+#!/usr/bin/python
+
+"""
+Checks and benchmarks evaluating products in families, which share the installed versions read from one source (see casper/families.py).
+Random installed versions, Versions and Ranges are compared by bisection and by the templates' comparison of each installed version in turn, which must agree.
+On a synthetic Mac (see Fixtures.py), a run must give the same results as evaluating every product on its own; failures are printed and fail the run.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from random import choice, randint, sample, seed
+from shutil import rmtree
+from sys import exit
+from tempfile import mkdtemp
+from time import time
+from Fixtures import build, install, reset
+from Versions import Spellings
+from casper import families
+from casper.evaluate import evaluate, pad_jamf
+from casper.runner import run
+from casper.versions import compare_versions, parse_version, rationalise_version, version_in_range
+
+# The templates' prioritisation of the results of each installed version
+def prioritise_results(Results):
+	if (len(Results) == 1):
+		r = Results[0]
+	elif ('Newer' in Results):
+		r = 'Newer'
+	elif ('Equal' in Results):
+		r = 'Equal'
+	elif ('Older' in Results):
+		r = 'Older'
+	elif ('N/A' in Results):
+		r = 'N/A'
+	else:
+		r = 'Error: Reading installed version'
+	return r
+
+# The templates' comparison of each installed version in turn
+def compare_installed(Installed, Version, Range, pad=None):
+	Results = []
+	for v in Installed:
+		v = rationalise_version(v)
+		if (v == ''):
+			Results.append('Error: Reading installed version')
+		else:
+			if (pad): v = pad(v)
+			if (Range and version_in_range(v, Range) == False):
+				Results.append('N/A')
+			else:
+				Results.append(compare_versions(v, Version))
+	return prioritise_results(Results)
+
+# Random installed versions, Version and Range from a corpus, with the Version within the Range
+def random_case(Corpus):
+	Installed = [choice(Corpus) for i in range(randint(0, 6))]
+	Version = choice([v for v in Corpus if v])
+	Range = None
+	if (randint(0, 2)):
+		a, b = sorted(sample(Corpus[1:], 2), key=parse_version)
+		if (parse_version(a) < parse_version(b) and version_in_range(Version, [a, b])): Range = [a, b]
+	return Installed, Version, Range
+
+# Cases where bisection and the templates' comparison disagree
+def mismatches(Corpus, cases):
+	r = []
+	for i in range(cases):
+		Installed, Version, Range = random_case(Corpus)
+		pad = choice([None, pad_jamf])
+		if (pad): Version, Range = pad(Version), Range and [pad(Range[0]), pad(Range[1])]
+		a = compare_installed(Installed, Version, Range, pad)
+		b = families.compare_family(families.sort_installed(list(Installed), pad), Version, Range)
+		if (a != b): r.append((Installed, Version, Range, a, b))
+	return r
+
+# Evaluate every product on its own, reading its source again each time
+def evaluate_alone(Products):
+	r = {}
+	for p in Products:
+		families.Installed.clear()
+		r[p['Name']] = evaluate(p)
+	return r
+
+def main():
+	parser = ArgumentParser(description='Checks and benchmarks evaluating products in families.')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	parser.add_argument('--cases', type=int, default=20000, help='random comparisons checked')
+	args = parser.parse_args()
+	seed(0)
+	Corpus = sorted(set(rationalise_version(v) for v in Spellings + ['1.2', '1.4', '2.0', '10.1', '10.2.5', '11.0', '11.1.2', '12.0']))
+	Failed = ['%r, Version %r, Range %r: %s by comparison, %s by bisection' % m for m in mismatches(Corpus, args.cases)]
+	print('random comparisons:    %d, %d mismatched' % (args.cases, len(Failed)))
+	root = mkdtemp(prefix='casper-families-')
+	try:
+		Fixture = build(root, apps=args.apps)
+		Products = Fixture['Products']
+		install(root)
+		reset()
+		r1 = run(Products)
+		Families = len(families.Installed)
+		# Time evaluation alone, with discovery and the sources already read
+		a = time()
+		r2 = evaluate_alone(Products)
+		a = time() - a
+		families.Installed.clear()
+		t = time()
+		for p in Products:
+			evaluate(p)
+		t = time() - t
+	finally:
+		rmtree(root)
+	print('products:              %d in %d families' % (len(Products), Families))
+	print('evaluated in families: %.3fs' % t)
+	print('evaluated alone:       %.3fs' % a)
+	for n in sorted(r1):
+		if (r1[n] != r2[n]): Failed.append('%s is %s in its family and %s alone' % (n, r1[n], r2[n]))
+	for e in Failed:
+		print('failed: ' + e)
+	print('checks:                %s' % ('failed' if Failed else 'passed'))
+	if (Failed):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
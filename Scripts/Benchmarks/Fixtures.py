@@ -0,0 +1,337 @@
+#!/usr/bin/python
+
+"""
+Builds a synthetic Mac in a folder, so the runtime can be benchmarked at a realistic scale off a Mac (e.g. on Linux).
+The fixture root holds what the manifest's products look for, at their paths rebased below the root: application bundles with XML and binary Info.plists, nested helper apps and frameworks, copies of bundles on other volumes, an Adobe caps pdb.db, a McAfee agent config.xml, plists and command binaries.
+Filler bundles and folders around them make discovery and crawling do a realistic amount of work.
+Stand-in mdfind, mdutil and defaults executables in the root's /usr/bin, and mount in its /sbin, answer from the fixture, and install() points the runtime at them and at state files inside the root.
+The benchmarks build their fixtures with this module; run on its own, it builds a fixture root in a folder and prints what it holds.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from importlib import import_module
+from json import dumps, loads
+from os import chmod, makedirs, remove
+from os.path import abspath, dirname, exists, join
+from random import Random
+from sqlite3 import connect
+from sys import executable, path
+import plistlib
+path.insert(0, join(dirname(dirname(abspath(__file__))), 'Library'))
+from casper import Commands, Delta, Index, Manifest, Pdb, Results, adobe, bundles, cache, command, crawler, families, plists, versions, volumes, xmltags
+from casper.products import load
+
+# Stand-in for /usr/bin/mdfind, answering CFBundleIdentifier queries from a fixture index
+StandInMdfind = '''#!%s
+import fnmatch, json, re, sys
+Index = json.load(open(%r))
+a = sys.argv[1:]
+attr = '-attr' in a
+if (attr): del a[a.index('-attr'):a.index('-attr') + 2]
+ids = re.findall('kMDItemCFBundleIdentifier *==? *"([^"]*)"', ' '.join(a))
+for Bundle, id in Index:
+	if (any(fnmatch.fnmatchcase(id, i) for i in ids)):
+		print(Bundle + ('   kMDItemCFBundleIdentifier = "' + id + '"' if attr else ''))
+'''
+# Stand-in for /usr/bin/mdutil, reporting indexing as enabled or disabled
+StandInMdutil = '''#!%s
+print('/:')
+print('	Indexing %s.')
+'''
+# Stand-in for /usr/bin/defaults, printing a top-level key of a plist
+StandInDefaults = '''#!%s
+import plistlib, sys
+try:
+	v = getattr(plistlib, 'load', getattr(plistlib, 'readPlist', None))(open(sys.argv[2], 'rb'))[sys.argv[3]]
+except Exception:
+	sys.exit(1)
+print(v)
+'''
+# Stand-in for /sbin/mount, printing a fixture mount table
+StandInMount = '''#!/bin/sh
+cat "%s"
+'''
+# Stub command, counting its invocations and sleeping before printing a version
+Stub = '''#!/bin/sh
+echo run >> "%s"
+sleep %s
+echo "%s"
+'''
+# Wrapper sleeping before running a stand-in
+Slow = '''#!/bin/sh
+sleep %.3f
+exec "%s" "$@"
+'''
+# Folders the crawler searches, before they are rebased below a fixture root
+Roots = list(crawler.Roots)
+
+# Write a text file, creating its folder
+def write_file(f, s):
+	if (not exists(dirname(f))): makedirs(dirname(f))
+	with open(f, 'w') as o:
+		o.write(s)
+
+# Write an executable, creating its folder
+def write_executable(f, s):
+	write_file(f, s)
+	chmod(f, 0o755)
+
+# Write a plist, in binary format where plistlib supports it, creating its folder
+def write_plist(d, f, binary):
+	if (not exists(dirname(f))): makedirs(dirname(f))
+	if (binary and hasattr(plistlib, 'FMT_BINARY')):
+		with open(f, 'wb') as o:
+			plistlib.dump(d, o, fmt=plistlib.FMT_BINARY)
+	elif (hasattr(plistlib, 'dump')):
+		with open(f, 'wb') as o:
+			plistlib.dump(d, o)
+	else:
+		plistlib.writePlist(d, f)
+
+# Contents of an Info.plist, with a document type array of a given size
+def info_plist(id, version, types=0):
+	d = {
+		'CFBundleIdentifier': id,
+		'CFBundleDocumentTypes': [{
+			'CFBundleTypeName': 'Document Type %d' % i,
+			'CFBundleTypeRole': 'Editor',
+			'CFBundleTypeExtensions': ['ext%d' % i, 'alt%d' % i],
+			'LSItemContentTypes': ['com.example.type%d' % i],
+		} for i in range(types)],
+		'CFBundleShortVersionString': version,
+		'CFBundleVersion': version,
+	}
+	return d
+
+# Write a bundle with helper apps and a framework nested in it, returning the (path, CFBundleIdentifier) of each bundle written
+def write_bundle(Bundle, d, binary, helpers=0):
+	id = d['CFBundleIdentifier']
+	write_plist(d, join(Bundle, 'Contents', 'Info.plist'), binary)
+	r = [(Bundle, id)]
+	for i in range(helpers):
+		Helper = join(Bundle, 'Contents', 'Helpers', 'Helper %d.app' % i)
+		write_plist(info_plist('%s.helper%d' % (id, i), d['CFBundleVersion']), join(Helper, 'Contents', 'Info.plist'), not binary)
+		r.append((Helper, '%s.helper%d' % (id, i)))
+	if (helpers):
+		Framework = join(Bundle, 'Contents', 'Frameworks', 'Core.framework')
+		write_plist(info_plist(id + '.core', d['CFBundleVersion']), join(Framework, 'Resources', 'Info.plist'), binary)
+		r.append((Framework, id + '.core'))
+	return r
+
+# Install a bundle in a built fixture root, adding it to the stand-in Spotlight index as a Mac would
+def add_bundle(root, Bundle, d):
+	f = join(root, 'usr', 'share', 'mdfind.json')
+	with open(f) as i:
+		Written = loads(i.read())
+	Written.extend(write_bundle(Bundle, d, False))
+	write_file(f, dumps(Written))
+
+# Write a stub command printing a version, returning its path; its invocations are counted in a file next to it
+def write_stub(f, version, delay=0):
+	write_executable(f, Stub % (f + '.count', delay, version))
+	open(f + '.count', 'w').close()
+	return f
+
+# Number of times a stub command has run
+def invocations(f):
+	r = len(open(f + '.count').read().splitlines())
+	return r
+
+# Build a synthetic pdb.db with payload rows for ADOBE_PDB products among other payloads, returning the number of rows
+def build_pdb(db, Products, rows):
+	rng = Random(0)
+	Rows = []
+	for p in Products:
+		if (rng.random() < 0.5):
+			Rows.append((p['productName'], p['Version']))
+		Rows.append(('%s_{%08X}_%s' % (p['productName'], rng.getrandbits(32), p.get('payloadName')), '%d.%d' % (rng.randint(1, 20), rng.randint(0, 9))))
+	while (len(Rows) < rows):
+		Rows.append(('Adobe Payload %d_{%08X}_Payload%d-mul' % (rng.randint(0, 999), rng.getrandbits(32), len(Rows)), '%d.%d.%d' % (rng.randint(1, 20), rng.randint(0, 9), rng.randint(0, 999))))
+	rng.shuffle(Rows)
+	if (not exists(dirname(db))): makedirs(dirname(db))
+	c = connect(db)
+	c.execute('CREATE TABLE payloads (domain TEXT, payloadID TEXT, productName TEXT, version TEXT)')
+	c.executemany('INSERT INTO payloads VALUES ("Adobe", ?, ?, ?)', [('{%d}' % i, n, v) for i, (n, v) in enumerate(Rows)])
+	c.commit()
+	c.close()
+	return len(Rows)
+
+# Write an agent configuration file in the style of the McAfee agent's config.xml, with a number of settings between the Version and GUID tags
+def build_agent_xml(f, settings, version='4.8.0.1816'):
+	if (not exists(dirname(f))): makedirs(dirname(f))
+	with open(f, 'w') as o:
+		o.write('<?xml version="1.0" encoding="UTF-8"?>\n<AgentConfig>\n<Agent><Name>EPOAGENT3700MACX</Name><Version>%s</Version></Agent>\n<Settings>\n' % version)
+		for i in range(settings):
+			o.write('<Setting><Section>Section%d</Section><Name>Setting%d</Name><Value>%s</Value></Setting>\n' % (i % 50, i, 'x' * (i % 40)))
+		o.write('</Settings>\n<Server><GUID>{4E9E9C4B-6D3A-4E36-9A5B-7E2A1C0D5F10}</GUID></Server>\n</AgentConfig>\n')
+
+# Build a tree of about a number of folders, three levels deep, with a bundle in every hundredth leaf folder, returning the number of folders and the bundles written
+def build_tree(root, folders):
+	fanout = max(2, int(round(folders ** (1 / 3.0))))
+	Written = []
+	n = 0
+	for a in range(fanout):
+		for b in range(fanout):
+			for c in range(fanout):
+				d = join(root, 'Folder %d' % a, 'Folder %d' % b, 'Folder %d' % c)
+				if (n % 100 == 0):
+					Written.extend(write_bundle(join(d, 'Bundle %d.app' % n), info_plist('com.example.bundle%d' % n, '%d.0' % (n % 20)), False))
+				else:
+					makedirs(d)
+				n += 1
+	return fanout ** 3 + fanout ** 2 + fanout, Written
+
+# Add a volume to the fixture's mount table
+def add_mount(root, Point, Flags):
+	f = join(root, 'usr', 'share', 'mount.txt')
+	with open(f) as i:
+		s = i.read()
+	write_file(f, s + '/dev/disk%d on %s (%s)\n' % (len(s.splitlines()) + 1, Point, ', '.join(Flags)))
+
+# Product definition with its paths rebased below a fixture root
+def rebase(root, p):
+	p = dict(p)
+	for k in ('Command', 'Default', 'Plist', 'Source', 'pdb'):
+		if (k in p): p[k] = root + p[k]
+	return p
+
+# Installed version of the nth product: the version the product expects, an older one, or None when it isn't installed
+def installed(p, n):
+	if (n % 3 == 0):
+		return p['Version']
+	if (n % 3 == 1):
+		return (p.get('Range') or ['1.0'])[0]
+	return None
+
+# Build a fixture root for products (the manifest's by default), returning a description of it with the rebased products
+def build(root, Products=None, apps=500, helpers=2, volumes=1, folders=0, rows=20000, settings=2000, latency=0, spotlight=True):
+	if (Products is None): Products = load(Manifest)
+	Products = [rebase(root, p) for p in Products]
+	Written = []
+	for n, p in enumerate(Products):
+		v = installed(p, n)
+		if (v is None or p['Template'] == 'ADOBE_PDB'): continue
+		if (p['Template'] in ('BUNDLE', 'CUSTOM-JAMF', 'CUSTOM-AdobeGamingSDK')):
+			id = p['CFBundleIdentifier'].replace('*', '0')
+			d = info_plist(id, v)
+			if (p.get('Key')): d[p['Key']] = v
+			if (p['Template'] == 'CUSTOM-AdobeGamingSDK'):
+				Bundle = join(p.get('Default') or join(root, 'Applications', p['Name']), 'Install.app')
+				write_file(join(dirname(Bundle), 'VersionInfo.txt'), v + '\n')
+			elif (p.get('Default') and n % 2):
+				Bundle = p['Default']
+			else:
+				Bundle = join(root, 'Applications', p['Name'] + '.app')
+			# Bundles shared by several products (e.g. Adobe Reader.app) are written by the first
+			if (not exists(Bundle)): Written.extend(write_bundle(Bundle, d, n % 2 == 0, helpers))
+			# Copies on other volumes, e.g. a backup of the Applications folder
+			for i in range(volumes):
+				if (n % 4 == 0): Written.extend(write_bundle(join(root, 'Volumes', 'Volume %d' % i, 'Applications', p['Name'] + '.app'), d, n % 2 == 1))
+		elif (p['Template'] == 'PLIST'):
+			write_plist({p['Key']: v}, p['Plist'], n % 2 == 0)
+		elif (p['Template'] == 'XML'):
+			build_agent_xml(p['Source'], settings, v)
+		elif (p['Template'] == 'CMD'):
+			write_stub(p['Command'], v, latency)
+	Databases = {}
+	for p in Products:
+		if (p['Template'] == 'ADOBE_PDB'): Databases.setdefault(p['pdb'], []).append(p)
+	for db in sorted(Databases):
+		build_pdb(db, Databases[db], rows)
+	# Filler applications from a handful of vendors
+	for n in range(apps):
+		d = info_plist('com.example.vendor%d.app%d' % (n % 25, n), '%d.%d.%d' % (n % 17, n % 7, n), n % 40)
+		Written.extend(write_bundle(join(root, 'Applications', 'Vendor %d' % (n % 25), 'Application %d.app' % n), d, n % 2 == 0, helpers))
+	if (folders):
+		folders, Tree = build_tree(join(root, 'Library', 'Filler'), folders)
+		Written.extend(Tree)
+	write_file(join(root, 'usr', 'share', 'mdfind.json'), dumps(Written))
+	Mdfind = join(root, 'usr', 'bin', 'mdfind')
+	if (latency):
+		write_executable(Mdfind + '.py', StandInMdfind % (executable, join(root, 'usr', 'share', 'mdfind.json')))
+		write_executable(Mdfind, Slow % (latency, Mdfind + '.py'))
+	else:
+		write_executable(Mdfind, StandInMdfind % (executable, join(root, 'usr', 'share', 'mdfind.json')))
+	write_executable(join(root, 'usr', 'bin', 'mdutil'), StandInMdutil % (executable, 'enabled' if spotlight else 'disabled'))
+	write_executable(join(root, 'usr', 'bin', 'defaults'), StandInDefaults % executable)
+	# The boot volume, and the other volumes as external disks
+	write_file(join(root, 'usr', 'share', 'mount.txt'), '/dev/disk1 on / (apfs, local, journaled)\n')
+	for i in range(volumes):
+		add_mount(root, join(root, 'Volumes', 'Volume %d' % i), ['hfs', 'local', 'nodev', 'nosuid', 'journaled', 'noowners'])
+	write_executable(join(root, 'sbin', 'mount'), StandInMount % join(root, 'usr', 'share', 'mount.txt'))
+	r = {'Root': root, 'Products': Products, 'Bundles': Written, 'Folders': folders}
+	return r
+
+# Runtime settings pointing at a fixture root, as (module, attribute, value)
+def settings(root):
+	r = [
+		('adobe', 'Snapshot', root + Pdb),
+		('bundles', 'Mdfind', join(root, 'usr', 'bin', 'mdfind')),
+		('bundles', 'Mdutil', join(root, 'usr', 'bin', 'mdutil')),
+		('cache', 'Path', root + Index),
+		('command', 'Path', root + Commands),
+		('delta', 'Path', root + Delta),
+		('crawler', 'Roots', [root + d for d in Roots] + [join(root, 'Volumes', '*', 'Applications')]),
+		('plists', 'DefaultsTool', join(root, 'usr', 'bin', 'defaults')),
+		('volumes', 'Folder', join(root, 'Volumes')),
+		('volumes', 'Mount', join(root, 'sbin', 'mount')),
+	]
+	return r
+
+# Point the runtime at a fixture root
+def install(root):
+	if (not exists(dirname(root + Results))): makedirs(dirname(root + Results))
+	for m, a, v in settings(root):
+		setattr(import_module('casper.' + m), a, v)
+
+# Clear everything memoised by a previous run and, given a fixture root, the results and state it left there, so the next run is cold
+def reset(root=None):
+	adobe.Names.clear()
+	adobe.Payloads.clear()
+	bundles.Found.clear()
+	del bundles.Status[:]
+	bundles.Unsearched.clear()
+	cache.State.clear()
+	del cache.Changed[:]
+	del cache.Checked[:]
+	cache.Canonical.clear()
+	cache.Identities.clear()
+	cache.Locks.clear()
+	command.Cached.clear()
+	crawler.Index.clear()
+	del crawler.Crawled[:]
+	families.Installed.clear()
+	plists.Values.clear()
+	versions.Parsed.clear()
+	del volumes.Mounts[:]
+	del volumes.Read[:]
+	xmltags.Tags.clear()
+	if (root is None):
+		return
+	for f in (Results, Index, Pdb, Commands, Delta):
+		if (exists(root + f)): remove(root + f)
+
+def main():
+	parser = ArgumentParser(description='Builds a synthetic Mac for the benchmarks in a folder.')
+	parser.add_argument('root', help='folder to build the fixture root in')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles')
+	parser.add_argument('--helpers', type=int, default=2, help='helper apps nested in each application bundle')
+	parser.add_argument('--volumes', type=int, default=1, help='other volumes holding copies of bundles')
+	parser.add_argument('--folders', type=int, default=0, help='approximate number of filler folders in /Library')
+	parser.add_argument('--rows', type=int, default=20000, help='payload rows in pdb.db')
+	parser.add_argument('--settings', type=int, default=2000, help='setting elements in the agent config.xml')
+	parser.add_argument('--latency', type=float, default=0, help='seconds the stand-in mdfind and stub commands sleep')
+	parser.add_argument('--spotlight-disabled', action='store_true', help='have the stand-in mdutil report indexing as disabled')
+	args = parser.parse_args()
+	root = abspath(args.root)
+	Fixture = build(root, None, args.apps, args.helpers, args.volumes, args.folders, args.rows, args.settings, args.latency, not args.spotlight_disabled)
+	print('root:                 %s' % root)
+	print('products:             %d' % len(Fixture['Products']))
+	print('bundles:              %d' % len(Fixture['Bundles']))
+	print('filler folders:       %d' % Fixture['Folders'])
+	for m, a, v in settings(root):
+		print('%-21s %s' % ('%s.%s:' % (m, a), v))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+
+"""
+Micro-benchmarks looking up one key in large Info.plist files against parsing the whole property list.
+Fixture plists (see Fixtures.py) carry large CFBundleDocumentTypes arrays, like those of Xcode, Office and Adobe bundles.
+Reports the time per file and, where the interpreter can measure them, the peak memory allocated per file and the peak number of allocations held.
+The allocations are the interpreter's allocated blocks (sys.getallocatedblocks), sampled as each function the call makes returns, above those allocated before it.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from gc import collect
+from os.path import join
+from shutil import rmtree
+from sys import getprofile, setprofile
+from tempfile import mkdtemp
+from time import time
+from Fixtures import info_plist, write_plist
+from casper import plists
+try:
+	import tracemalloc
+except ImportError:
+	tracemalloc = None
+try:
+	from sys import getallocatedblocks
+except ImportError:
+	getallocatedblocks = None
+
+# Read a key by parsing the whole plist
+def read_full(p, k):
+	with open(p, 'rb') as f:
+		v = plists.format_value(plists.parse_plist(f.read()).get(k))
+	return v
+
+# Peak number of blocks a call holds allocated, sampled as each function it calls returns
+def count_allocations(reader, p, k):
+	# Garbage left by earlier calls would otherwise be collected during this one, and offset its allocations
+	collect()
+	Base = getallocatedblocks()
+	Peak = [Base]
+	def sample(frame, event, arg):
+		if (event in ('return', 'c_return')): Peak[0] = max(Peak[0], getallocatedblocks())
+	profile = getprofile()
+	setprofile(sample)
+	try:
+		reader(p, k)
+	finally:
+		setprofile(profile)
+	return Peak[0] - Base
+
+# Time a reader over a number of iterations, returning seconds per call, the peak bytes allocated by a call and the peak number of blocks it holds
+def measure(reader, p, k, iterations):
+	t = time()
+	for i in range(iterations):
+		reader(p, k)
+	t = (time() - t) / iterations
+	peak = None
+	count = None
+	if (tracemalloc):
+		tracemalloc.start()
+		reader(p, k)
+		peak = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+	if (getallocatedblocks):
+		count = count_allocations(reader, p, k)
+	return t, peak, count
+
+def main():
+	parser = ArgumentParser(description='Benchmarks lazy plist key lookup against full parsing.')
+	parser.add_argument('--types', type=int, default=2000, help='entries in the CFBundleDocumentTypes array')
+	parser.add_argument('--iterations', type=int, default=50, help='lookups timed per reader and format')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-lookup-')
+	try:
+		d = info_plist('com.example.large', '7.2.1', args.types)
+		d['CFBundleVersion'] = '7C1002'
+		for name, binary in (('binary', True), ('xml', False)):
+			p = join(root, 'Large.app', 'Contents', 'Info-%s.plist' % name)
+			write_plist(d, p, binary)
+			for reader in (read_full, plists.read_plist_native):
+				t, peak, count = measure(reader, p, 'CFBundleShortVersionString', args.iterations)
+				print('%-6s %-18s %8.3fms per file  %s KB peak allocated  %s allocations at peak' % (name, reader.__name__, 1000 * t, '%.1f' % (peak / 1024.0) if peak is not None else 'n/a', count if count is not None else 'n/a'))
+	finally:
+		rmtree(root)
+
+if __name__ == '__main__':
+	main()
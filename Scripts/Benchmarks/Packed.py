@@ -0,0 +1,69 @@
+#!/usr/bin/python
+
+"""
+Checks and benchmarks the packed Extension Attribute, which reports every product's result in one string, on a synthetic Mac (see Fixtures.py).
+Every smart group criterion written by BuildSmartGroups.py must match the packed results exactly when its product has its result, and each category must pack only its own products.
+Reports the time recon spends on one packed attribute against one attribute per product, each reading the results file; failures are printed and fail the run.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from os.path import join
+from shutil import rmtree
+from sys import exit
+from tempfile import mkdtemp
+from time import time
+from Fixtures import build, install, reset
+from casper import Results
+from casper.packed import category, code, criterion, pack
+from casper.products import write_manifest
+from casper.runner import packed, result, run, write_results
+
+# Results a smart group may match
+Codes = ['Older', 'Equal', 'Newer', 'N/A', 'Error']
+
+def main():
+	parser = ArgumentParser(description='Checks and benchmarks the packed Extension Attribute.')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-packed-')
+	Failed = []
+	try:
+		Fixture = build(root, apps=args.apps)
+		Products = Fixture['Products']
+		install(root)
+		reset(root)
+		Manifest = join(root, 'products.json')
+		write_manifest(Products, Manifest)
+		r = run(Products)
+		write_results(r, root + Results)
+		# Answer each way from the results file, as recon does
+		t = time()
+		s = packed(None, root + Results, 300, Manifest)
+		t = time() - t
+		a = time()
+		for p in Products:
+			result(p['Name'], root + Results, 300, Manifest)
+		a = time() - a
+		for p in Products:
+			for c in Codes:
+				if ((criterion(p['Name'], c) in s) != (code(r[p['Name']]) == c)): Failed.append('%s matches %s in %s' % (p['Name'], criterion(p['Name'], c), r[p['Name']]))
+		Categories = sorted(set(category(p) for p in Products))
+		for c in Categories:
+			s = pack(r, Products, c)
+			for p in Products:
+				if ((criterion(p['Name'], code(r[p['Name']])) in s) != (category(p) == c)): Failed.append('%s packed in category %s' % (p['Name'], c))
+		Length = len(packed(None, root + Results, 300, Manifest))
+	finally:
+		rmtree(root)
+	print('products:              %d in %d categories' % (len(Products), len(Categories)))
+	print('packed attribute:      %d characters, %.1fms' % (Length, t * 1000))
+	print('one per product:       %d attributes, %.1fms' % (len(Products), a * 1000))
+	for e in Failed:
+		print('failed: ' + e)
+	print('checks:                %s' % ('failed' if Failed else 'passed'))
+	if (Failed):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
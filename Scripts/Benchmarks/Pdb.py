@@ -0,0 +1,84 @@
+#!/usr/bin/python
+
+"""
+Benchmarks answering every ADOBE_PDB product from one pass over pdb.db against one LIKE query per product.
+The pdb.db of a synthetic Mac (see Fixtures.py) has payload rows for the manifest's products (plain and with payload suffixes) among tens of thousands of other payloads.
+Reports the time for every product and checks that both give the same versions.
+Then times the JSON snapshot of pdb.db: cold (reading pdb.db and writing the snapshot), warm (reading the snapshot), and a fresh interpreter on the warm path, which must not import sqlite3.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from shutil import rmtree
+from sqlite3 import connect
+from subprocess import check_output
+from sys import executable, path
+from tempfile import mkdtemp
+from time import time
+from Fixtures import build, install
+from casper import adobe
+
+# The template's original query, opening the database for every product
+def query_like(db, product, payload):
+	c = connect(db)
+	q = c.execute('SELECT version FROM payloads WHERE productName LIKE "' + product \
+				+ '" OR productName LIKE "' + product + '_%_' + str(payload) + '"').fetchall()
+	c.close()
+	r = [i[0] for i in q]
+	return r
+
+# Answers a product from the snapshot in a fresh interpreter, printing whether sqlite3 was imported
+Fresh = '''
+import sys
+sys.path.insert(0, %r)
+from casper import adobe
+adobe.Snapshot = %r
+adobe.query_db_product(%r, 'Adobe Photoshop CC', None)
+print('sqlite3' in sys.modules)
+'''
+
+# Time reading the payloads of a database, with the memo cleared
+def time_read(db):
+	adobe.Payloads.clear()
+	adobe.Names.clear()
+	t = time()
+	adobe.read_payloads(db)
+	return time() - t
+
+# Time querying every product, returning seconds and the sorted versions of each product
+def measure(query, db, Products):
+	t = time()
+	r = dict((p['Name'], sorted(query(db, p['productName'], p.get('payloadName')))) for p in Products)
+	return time() - t, r
+
+def main():
+	parser = ArgumentParser(description='Benchmarks one pass over pdb.db against one query per product.')
+	parser.add_argument('--rows', type=int, default=50000, help='payload rows in the synthetic pdb.db')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-pdb-')
+	try:
+		Products = [p for p in build(root, apps=0, rows=args.rows)['Products'] if p['Template'] == 'ADOBE_PDB']
+		install(root)
+		Snapshot = adobe.Snapshot
+		db = Products[0]['pdb']
+		rows = connect(db).execute('SELECT COUNT(*) FROM payloads').fetchone()[0]
+		a, r1 = measure(query_like, db, Products)
+		adobe.Snapshot = None
+		b, r2 = measure(adobe.query_db_product, db, Products)
+		adobe.Snapshot = Snapshot
+		cold = time_read(db)
+		warm = time_read(db)
+		imported = check_output([executable, '-c', Fresh % (path[0], adobe.Snapshot, db)]).decode('utf-8').strip()
+		print('products:             %d' % len(Products))
+		print('payload rows:         %d' % rows)
+		print('query per product:    %.3fs' % a)
+		print('one pass:             %.3fs' % b)
+		print('results match:        %s' % (r1 == r2))
+		print('snapshot cold:        %.3fs' % cold)
+		print('snapshot warm:        %.3fs' % warm)
+		print('warm imports sqlite3: %s' % imported)
+	finally:
+		rmtree(root)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,49 @@
+#!/usr/bin/python
+
+"""
+Benchmarks reading a key from Info.plist files in-process against running '/usr/bin/defaults read' for each file.
+The Info.plist files (XML and binary) are those of the bundles of a synthetic Mac (see Fixtures.py).
+Where /usr/bin/defaults doesn't exist (e.g. on Linux), the fixture's stand-in, which prints the key with plistlib, is used.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from os.path import exists, join
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+from Fixtures import build, install
+from casper import plists
+
+# Info.plist paths of the bundles in a fixture
+def info_plists(Fixture):
+	r = [join(Bundle, 'Resources' if Bundle.endswith('.framework') else 'Contents', 'Info.plist') for Bundle, id in Fixture['Bundles']]
+	return r
+
+# Time reading a key from every plist with a reader
+def time_reader(reader, Plists, k):
+	t = time()
+	r = [reader(p, k) for p in Plists]
+	return time() - t, r
+
+def main():
+	parser = ArgumentParser(description='Benchmarks in-process plist reading against /usr/bin/defaults.')
+	parser.add_argument('--apps', type=int, default=700, help='filler application bundles in the fixture, each with helper apps and a framework (700 make about 3000 Info.plist files)')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-plists-')
+	try:
+		Plists = info_plists(build(root, apps=args.apps))
+		if (not exists(plists.DefaultsTool)): install(root)
+		native, a = time_reader(plists.read_plist_native, Plists, 'CFBundleShortVersionString')
+		defaults, b = time_reader(plists.read_plist_defaults, Plists, 'CFBundleShortVersionString')
+		print('Info.plist files:  %d' % len(Plists))
+		print('defaults command:  %s' % plists.DefaultsTool)
+		print('in-process:        %.3fs (%.3fms per file)' % (native, 1000 * native / len(Plists)))
+		print('defaults:          %.3fs (%.3fms per file)' % (defaults, 1000 * defaults / len(Plists)))
+		print('speedup:           %.1fx' % (defaults / native))
+		print('results match:     %s' % (a == b))
+	finally:
+		rmtree(root)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,68 @@
+#!/usr/bin/python
+
+"""
+Benchmarks evaluating products concurrently against one at a time, on stub subprocesses with injected latency.
+The fixture is a synthetic Mac (see Fixtures.py) with CMD products whose stub commands sleep before printing a version, BUNDLE products found through a stand-in mdfind that sleeps too, and PLIST and XML products read from files.
+Reports the wall time of a full run with different numbers of worker threads, and checks every run gives the same results as running one at a time.
+Also checks that probes which hang on every worker are given up on at the timeout, with the probes queued behind them; failures are printed and fail the run.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from shutil import rmtree
+from sys import exit
+from tempfile import mkdtemp
+from time import sleep, time
+from Fixtures import build, install, reset
+from casper.runner import run
+from casper.scheduler import TimedOut, schedule
+
+# Products of each template for the fixture, with paths as they would be on a Mac
+def products(commands):
+	Products = []
+	for i in range(commands):
+		Products.append({'Name': 'Command %d' % i, 'Template': 'CMD', 'Command': '/usr/local/bin/tool%d' % i, 'Version': '%d.1' % (i % 7)})
+		Products.append({'Name': 'Bundle %d' % i, 'Template': 'BUNDLE', 'CFBundleIdentifier': 'com.example.app%d' % i, 'Key': 'CFBundleShortVersionString', 'Version': '2.0'})
+		Products.append({'Name': 'Plist %d' % i, 'Template': 'PLIST', 'Plist': '/Library/Preferences/com.example.plist%d.plist' % i, 'Key': 'CFBundleShortVersionString', 'Version': '3.0'})
+		Products.append({'Name': 'Xml %d' % i, 'Template': 'XML', 'Source': '/etc/example%d/config.xml' % i, 'Tag': 'Version', 'Version': '4.0'})
+	return sorted(Products, key=lambda p: p['Name'])
+
+def main():
+	parser = ArgumentParser(description='Benchmarks concurrent product evaluation against one product at a time.')
+	parser.add_argument('--commands', type=int, default=24, help='CMD products, and products of each other template')
+	parser.add_argument('--apps', type=int, default=100, help='filler application bundles in the fixture')
+	parser.add_argument('--latency', type=float, default=0.1, help='seconds each stub subprocess sleeps')
+	parser.add_argument('--workers', type=int, action='append', help='worker threads to run with (repeatable)')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-scheduler-')
+	Failed = []
+	try:
+		Fixture = build(root, products(args.commands), args.apps, latency=args.latency)
+		Products = Fixture['Products']
+		install(root)
+		print('products:             %d, stub subprocesses sleeping %.0fms' % (len(Products), 1000 * args.latency))
+		Sequential = None
+		for workers in [1] + (args.workers or [4, 8, 16]):
+			reset(root)
+			t = time()
+			r = run(Products, workers)
+			t = time() - t
+			if (Sequential is None): Sequential = r
+			print('%2d workers:           %.3fs, results match: %s' % (workers, t, r == Sequential))
+			if (r != Sequential): Failed.append('%d workers gave different results' % workers)
+		# Probes hanging on every worker, with one queued behind them
+		t = time()
+		r = schedule([(sleep, (100,)), (sleep, (100,)), (lambda: 'ok', ())], 2, 1)
+		t = time() - t
+		print('hung workers:         %.3fs, %d probes given up on' % (t, len([v for v in r if isinstance(v, TimedOut)])))
+		if (t > 2 or not all(isinstance(v, TimedOut) for v in r)): Failed.append('hung workers returned %r after %.3fs' % (r, t))
+	finally:
+		rmtree(root)
+	for e in Failed:
+		print('failed: ' + e)
+	print('checks:               %s' % ('failed' if Failed else 'passed'))
+	if (Failed):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python
+
+"""
+Benchmarks bundle discovery with one Spotlight query per product against one batched query for every product.
+The fixture is a synthetic Mac (see Fixtures.py), whose stand-in mdfind and mdutil serve results from the fixture, so the benchmark runs off a Mac.
+Reports wall time and the number of subprocesses spawned for a full run of the manifest.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+from Fixtures import build, install, reset
+from casper import command
+from casper.evaluate import evaluate
+from casper.runner import run
+
+# Count subprocesses spawned by the runtime
+Spawned = []
+def counting(Popen):
+	def wrapper(*args, **kwargs):
+		Spawned.append(args[0])
+		return Popen(*args, **kwargs)
+	return wrapper
+
+# Time a full run, returning seconds, subprocesses spawned and results
+def measure(root, evaluator, Products):
+	reset(root)
+	del Spawned[:]
+	t = time()
+	r = evaluator(Products)
+	return time() - t, len(Spawned), r
+
+# Evaluate each product on its own, with one Spotlight query per product
+def run_per_product(Products):
+	r = dict((p['Name'], evaluate(p)) for p in Products)
+	return r
+
+def main():
+	parser = ArgumentParser(description='Benchmarks batched Spotlight discovery against one query per product.')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-spotlight-')
+	try:
+		Fixture = build(root, apps=args.apps)
+		Products = Fixture['Products']
+		install(root)
+		command.Popen = counting(command.Popen)
+		single, a, r1 = measure(root, run_per_product, Products)
+		batched, b, r2 = measure(root, run, Products)
+		print('products:             %d' % len(Products))
+		print('bundles:              %d' % len(Fixture['Bundles']))
+		print('per-product queries:  %.3fs, %d subprocesses' % (single, a))
+		print('batched query:        %.3fs, %d subprocesses' % (batched, b))
+		print('results match:        %s' % (r1 == r2))
+	finally:
+		rmtree(root)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,159 @@
+#!/usr/bin/python
+
+"""
+Measures the start-up cost of an Extension Attribute for each template, and fails when a template goes over its budget.
+Each template gets a manifest of one installed product of a synthetic Mac (see Fixtures.py), and a fresh interpreter reads its result as an Extension Attribute does.
+A cold start has no results, bundle index, pdb.db snapshot or command output cached yet, so it evaluates the product; a warm start reads the results written by the cold start.
+Wall time (median of several runs), the cost of each module imported (from -X importtime, where the interpreter supports it) and subprocesses spawned are appended to a JSON history.
+Budgets are milliseconds of wall time per template and start, read from Budgets.json next to this script; each is the slowest start measured across Python 2 and 3 plus 50%, rounded up to 10ms.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from ast import literal_eval
+from json import dumps, load
+from os.path import abspath, dirname, exists, join
+from platform import python_version
+from shutil import rmtree
+from subprocess import PIPE, Popen
+from sys import executable, exit, path, version_info
+from tempfile import mkdtemp
+from time import time
+from Fixtures import build, installed, reset, settings
+from casper import Results
+from casper.products import write_manifest
+
+# Runs a product's Extension Attribute in a fresh interpreter, counting the subprocesses it spawns
+# The settings and the count are applied as the runtime imports the modules they patch, so the driver imports nothing the attribute wouldn't
+Driver = '''
+import sys
+try:
+	import builtins
+except ImportError:
+	import __builtin__ as builtins
+Spawned = []
+Pending = {'subprocess': []}
+for m, a, v in %(Settings)r:
+	Pending.setdefault('casper.' + m, []).append((a, v))
+def counting(init):
+	def wrapper(self, *args, **kwargs):
+		Spawned.append(1)
+		init(self, *args, **kwargs)
+	return wrapper
+_import = builtins.__import__
+def importing(name, globals=None, locals=None, fromlist=(), level=0):
+	r = _import(name, globals, locals, fromlist, level)
+	# Modules named by the import have finished importing once it returns
+	for m in [m for m in [name] + [name + '.' + f for f in fromlist or ()] if m in Pending and m in sys.modules]:
+		if (m == 'subprocess'): sys.modules[m].Popen.__init__ = counting(sys.modules[m].Popen.__init__)
+		for a, v in Pending.pop(m):
+			setattr(sys.modules[m], a, v)
+	return r
+builtins.__import__ = importing
+sys.path.insert(0, %(Library)r)
+from casper.runner import result
+r = result(%(Name)r, %(Results)r, 300, %(Manifest)r, %(Header)r)
+sys.stdout.write(%(Marker)r + repr([r, len(Spawned)]))
+'''
+Marker = 'Startup result: '
+
+# One installed product of each template in a fixture
+def select_products(Fixture):
+	r = {}
+	for n, p in enumerate(Fixture['Products']):
+		if (not p['Template'] in r and installed(p, n) is not None): r[p['Template']] = p
+	return [r[t] for t in sorted(r)]
+
+# Parse -X importtime output into microseconds of each module's own import time
+def import_times(s):
+	r = {}
+	for l in s.splitlines():
+		if (not l.startswith('import time:') or 'self [us]' in l): continue
+		a = l[len('import time:'):].split('|')
+		r[a[2].strip()] = int(a[0])
+	return r
+
+# Run a product's Extension Attribute once, returning seconds, its result, subprocesses spawned and import times
+def start(root, p, importtime):
+	cmd = [executable]
+	if (importtime): cmd += ['-X', 'importtime']
+	cmd += ['-c', Driver % {
+		'Library': path[0], 'Settings': settings(root),
+		'Name': p['Name'], 'Results': root + Results, 'Manifest': join(root, p['Template'] + '.json'), 'Marker': Marker,
+		'Header': dict((k, v) for k, v in p.items() if not k in ('Name', 'Template')),
+	}]
+	t = time()
+	o, e = Popen(cmd, stdout=PIPE, stderr=PIPE).communicate()
+	t = time() - t
+	o = o.decode('utf-8')
+	r, Spawned = literal_eval(o[o.index(Marker) + len(Marker):])
+	return t, r, Spawned, import_times(e.decode('utf-8'))
+
+# Median of a list of numbers
+def median(a):
+	a = sorted(a)
+	return a[len(a) // 2]
+
+# Measure cold and warm starts of a product, returning a record of each
+def measure(root, p, runs, importtime):
+	r = {}
+	for Start in ('cold', 'warm'):
+		Times = []
+		for i in range(runs):
+			if (Start == 'cold'): reset(root)
+			t, Result, Spawned, Imports = start(root, p, False)
+			Times.append(t)
+		if (importtime):
+			if (Start == 'cold'): reset(root)
+			Imports = start(root, p, True)[3]
+		Slowest = sorted(Imports, key=lambda m: -Imports[m])[:15]
+		r[Start] = {
+			'Milliseconds': round(median(Times) * 1000, 1), 'Result': Result, 'Subprocesses': Spawned,
+			'Modules': len(Imports), 'ImportMicroseconds': sum(Imports.values()),
+			'SlowestImports': dict((m, Imports[m]) for m in Slowest),
+		}
+	return r
+
+def main():
+	parser = ArgumentParser(description='Measures Extension Attribute start-up for each template against a budget.')
+	parser.add_argument('--runs', type=int, default=5, help='starts of each template to take the median of')
+	parser.add_argument('--budgets', default=join(dirname(abspath(__file__)), 'Budgets.json'), help='budgets in milliseconds, by start and template')
+	parser.add_argument('--history', default=join(dirname(abspath(__file__)), 'Startup.json'), help='JSON history to append the measurements to')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	parser.add_argument('--template', action='append', help='measure only a template (repeatable)')
+	args = parser.parse_args()
+	with open(args.budgets) as i:
+		Budgets = load(i)
+	importtime = version_info >= (3, 7)
+	root = mkdtemp(prefix='casper-startup-')
+	try:
+		Products = select_products(build(root, apps=args.apps))
+		Products = [p for p in Products if not args.template or p['Template'] in args.template]
+		for p in Products:
+			write_manifest([p], join(root, p['Template'] + '.json'))
+		Record = {'Time': int(time()), 'Python': python_version(), 'Templates': {}}
+		Over = []
+		for p in Products:
+			r = Record['Templates'][p['Template']] = measure(root, p, args.runs, importtime)
+			for Start in ('cold', 'warm'):
+				Budget = Budgets.get(Start, {}).get(p['Template'])
+				if (Budget and r[Start]['Milliseconds'] > Budget): Over.append((p['Template'], Start, r[Start]['Milliseconds'], Budget))
+			print('%-22s cold %7.1fms %2d subprocesses   warm %7.1fms %2d subprocesses   %d modules   %s' % (
+				p['Template'], r['cold']['Milliseconds'], r['cold']['Subprocesses'],
+				r['warm']['Milliseconds'], r['warm']['Subprocesses'], r['cold']['Modules'], r['cold']['Result']))
+	finally:
+		rmtree(root)
+	History = []
+	if (exists(args.history)):
+		with open(args.history) as i:
+			History = load(i)
+	History.append(Record)
+	with open(args.history, 'w') as o:
+		o.write(dumps(History, sort_keys=True, indent=1))
+	for Template, Start, t, Budget in Over:
+		print('over budget: %s %s start took %.1fms, budget %dms' % (Template, Start, t, Budget))
+	if (Over):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,113 @@
+#!/usr/bin/python
+
+"""
+Checks and benchmarks version comparison against pkg_resources.parse_version.
+The corpus is every Version and Range string in the manifest, rationalised as the templates do, plus installed-version spellings with pre-release, post-release and build suffixes.
+Every pair in the corpus must order the same way as pkg_resources orders it; mismatches are printed and fail the run.
+Reports the time to import each implementation in a fresh interpreter, and comparisons per second with the template's original compare_versions.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from itertools import product
+from os.path import abspath, dirname, join
+from subprocess import check_call
+from sys import executable, exit, path
+from time import time
+import warnings
+path.insert(0, join(dirname(dirname(abspath(__file__))), 'Library'))
+from casper import Manifest, versions
+from casper.products import load
+
+# Installed-version spellings seen in Info.plists, XML files and command output
+Spellings = [
+	'', '0', '0.0', '1.0.0', '1.0 ', '1.0 build 5', '1.0-1', '1.0-final', '1.0+5', '1.0+abc.5',
+	'1.0a', '1.0b2', '1.0c1', '1.0rc1', '1.0pre', '1.0dev', '1.0.dev3', '1.0.post', '1.0.post2',
+	'1-2-3', '1.2.3-', '2.0-beta', '3.0.1-rc2', '5.0 beta 3', '9.4f548', '10.6.8 (10k549)', '12.2.3r183', '2015.006',
+]
+
+# Every Version and Range string in the manifest, and the installed-version spellings, rationalised
+def corpus(Products):
+	r = set(Spellings)
+	for p in Products:
+		for v in [p.get('Version')] + list(p.get('Range', [])):
+			if (v): r.update([v, versions.rationalise_version(v)])
+	r.update(versions.rationalise_version(v) for v in Spellings)
+	return sorted(r)
+
+# Pairs that pkg_resources and the version keys order differently
+def mismatches(Corpus, parse_version):
+	r = []
+	Keys = dict((v, versions.parse_version(v)) for v in Corpus)
+	Reference = {}
+	for v in Corpus:
+		try:
+			Reference[v] = parse_version(v)
+		except Exception:
+			pass
+	for a, b in product(sorted(Reference), repeat=2):
+		if ((Reference[a] < Reference[b]) != (Keys[a] < Keys[b]) or (Reference[a] == Reference[b]) != (Keys[a] == Keys[b])):
+			r.append((a, b))
+	return r, set(Reference)
+
+# Seconds to start an interpreter and import a module, best of a number of runs
+def import_time(module, runs):
+	r = []
+	for i in range(runs):
+		t = time()
+		check_call([executable, '-c', 'import sys; sys.path.insert(0, %r); import %s' % (path[0], module)])
+		r.append(time() - t)
+	return min(r)
+
+# The template's original comparison, parsing each version up to three times
+def original_compare(parse_version):
+	def compare_versions(v1, v2):
+		if (parse_version(v1) < parse_version(v2)):
+			r = 'Older'
+		elif (parse_version(v1) == parse_version(v2)):
+			r = 'Equal'
+		elif (parse_version(v1) > parse_version(v2)):
+			r = 'Newer'
+		return r
+	return compare_versions
+
+# Comparisons per second over every pair in the corpus
+def throughput(compare, Pairs):
+	t = time()
+	r = [compare(a, b) for a, b in Pairs]
+	return len(Pairs) / (time() - t), r
+
+def main():
+	parser = ArgumentParser(description='Checks and benchmarks version comparison against pkg_resources.')
+	parser.add_argument('--runs', type=int, default=5, help='interpreter starts to time each import with')
+	args = parser.parse_args()
+	Corpus = corpus(load(Manifest))
+	Pairs = [(a, b) for a, b in product(Corpus, repeat=2) if a and b]
+	print('corpus:               %d versions, %d pairs' % (len(Corpus), len(Pairs)))
+	print('import casper:        %.3fs' % import_time('casper.versions', args.runs))
+	try:
+		from pkg_resources import parse_version
+	except ImportError:
+		print('pkg_resources is not installed, skipping the equivalence check')
+		versions.Parsed.clear()
+		print('version keys:         %d comparisons/s' % throughput(versions.compare_versions, Pairs)[0])
+		return
+	print('import pkg_resources: %.3fs' % import_time('pkg_resources', args.runs))
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore')
+		Failed, Parsable = mismatches(Corpus, parse_version)
+		Pairs = [(a, b) for a, b in Pairs if a in Parsable and b in Parsable]
+		a, r1 = throughput(original_compare(parse_version), Pairs)
+	versions.Parsed.clear()
+	b, r2 = throughput(versions.compare_versions, Pairs)
+	print('checked:              %d versions pkg_resources can parse, %d mismatched pairs' % (len(Parsable), len(Failed)))
+	for v1, v2 in Failed:
+		print('  %r %r' % (v1, v2))
+	print('pkg_resources:        %d comparisons/s' % a)
+	print('version keys:         %d comparisons/s' % b)
+	print('results match:        %s' % (r1 == r2))
+	if (Failed or r1 != r2):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
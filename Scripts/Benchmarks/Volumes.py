@@ -0,0 +1,99 @@
+#!/usr/bin/python
+
+"""
+Checks that bundles on network, Time Machine and external volumes are skipped as each product's Volumes policy says, on a synthetic Mac (see Fixtures.py).
+Newer copies of the installed BUNDLE products are added to a network share, a Time Machine destination and an external disk, all reported by Spotlight.
+With the default policy the results must not change and no path on those volumes may be touched; with Volumes = 'removable' the external copies must be found, and the others still skipped.
+Failures are printed and fail the run.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from os import makedirs
+from os.path import join
+from shutil import rmtree
+from sys import exit
+from tempfile import mkdtemp
+from time import time
+from Fixtures import add_bundle, add_mount, build, info_plist, install, installed, reset
+from casper import cache, volumes
+from casper.runner import run
+from casper.versions import compare_versions, rationalise_version, version_in_range
+
+# Paths whose signature is read
+Touched = []
+def counting(signature):
+	def wrapper(p):
+		Touched.append(p)
+		return signature(p)
+	return wrapper
+
+# Time a cold run, returning seconds, results and the paths touched below any of the folders
+def measure(root, Products, Folders):
+	reset(root)
+	del Touched[:]
+	t = time()
+	r = run(Products)
+	t = time() - t
+	Below = [p for p in Touched if any(p.startswith(d + '/') for d in Folders)]
+	return t, r, Below
+
+# A version newer than a product's, within its Range
+def newer(p):
+	v = p['Version'] + '.1'
+	Range = p.get('Range')
+	if (compare_versions(rationalise_version(v), rationalise_version(p['Version'])) != 'Newer'):
+		return None
+	if (Range and not version_in_range(rationalise_version(v), [rationalise_version(a) for a in Range])):
+		return None
+	return v
+
+def main():
+	parser = ArgumentParser(description='Checks that bundles on network, Time Machine and external volumes are skipped as each product says.')
+	parser.add_argument('--apps', type=int, default=500, help='filler application bundles in the fixture')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-volumes-')
+	Failed = []
+	cache.signature = counting(cache.signature)
+	try:
+		Fixture = build(root, apps=args.apps)
+		Products = Fixture['Products']
+		install(root)
+		Share, Backups, External = [join(root, 'Volumes', n) for n in ('Share', 'Backups', 'External')]
+		a, r1, Below = measure(root, Products, [Share, Backups, External])
+		add_mount(root, Share, ['smbfs', 'nodev', 'nosuid', 'mounted by admin'])
+		makedirs(join(Backups, 'Backups.backupdb'))
+		add_mount(root, Backups, ['hfs', 'local', 'nodev', 'nosuid', 'journaled'])
+		add_mount(root, External, ['hfs', 'local', 'nodev', 'nosuid', 'journaled', 'noowners'])
+		Copied = []
+		for n, p in enumerate(Products):
+			if (p['Template'] != 'BUNDLE' or installed(p, n) is None or newer(p) is None): continue
+			for d in (Share, Backups, External):
+				add_bundle(root, join(d, 'Applications', p['Name'] + '.app'), info_plist(p['CFBundleIdentifier'].replace('*', '0'), newer(p)))
+			Copied.append(p['Name'])
+		b, r2, Below = measure(root, Products, [Share, Backups, External])
+		if (r2 != r1): Failed.append('%d results changed with the default policy' % len([k for k in r1 if r1[k] != r2[k]]))
+		if (Below): Failed.append('%d paths touched on skipped volumes with the default policy' % len(Below))
+		for p in Products:
+			if (p['Name'] in Copied): p['Volumes'] = 'removable'
+		c, r3, Skipped = measure(root, Products, [Share, Backups])
+		for k in sorted(r1):
+			e = 'Newer' if k in Copied else r1[k]
+			if (r3[k] != e): Failed.append('%s is %s including removable volumes, not %s' % (k, r3[k], e))
+		if (Skipped): Failed.append('%d paths touched on network or backup volumes including removable volumes' % len(Skipped))
+		Classes = [k for Point, k in volumes.mounts()]
+	finally:
+		rmtree(root)
+	print('products:              %d, %d with newer copies on each volume' % (len(Products), len(Copied)))
+	print('volumes:               %s' % ', '.join('%d %s' % (Classes.count(k), k) for k in sorted(set(Classes))))
+	print('before the copies:     %.3fs' % a)
+	print('local volumes:         %.3fs, %d paths touched on other volumes' % (b, len(Below)))
+	print('removable volumes:     %.3fs, %d paths touched on network or backup volumes' % (c, len(Skipped)))
+	for e in Failed:
+		print('failed: ' + e)
+	print('checks:                %s' % ('failed' if Failed else 'passed'))
+	if (Failed):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
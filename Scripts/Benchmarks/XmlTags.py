@@ -0,0 +1,68 @@
+#!/usr/bin/python
+
+"""
+Micro-benchmarks reading tags from a large agent XML file by streaming against parsing the whole document.
+The fixture is a multi-megabyte configuration file in the style of the McAfee agent's config.xml (see Fixtures.py), with the Version tag near the start and a GUID tag at the end.
+Reports the time per read and, where tracemalloc is available, the peak memory allocated per read.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from os.path import getsize
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+from xml.etree.ElementTree import parse
+from Fixtures import build_agent_xml
+from casper import xmltags
+try:
+	import tracemalloc
+except ImportError:
+	tracemalloc = None
+
+# Read tags by parsing the whole document, as the template did
+def read_full(s, tags):
+	r = dict((t, parse(s).getroot().find('.//' + t).text) for t in tags)
+	return r
+
+# Read tags in one streaming pass
+def read_streaming(s, tags):
+	r = xmltags.scan_tags(s, tags)
+	return r
+
+# Time a reader over a number of iterations, returning seconds per call, the peak bytes allocated by a call and its result
+def measure(reader, s, tags, iterations):
+	t = time()
+	for i in range(iterations):
+		r = reader(s, tags)
+	t = (time() - t) / iterations
+	peak = None
+	if (tracemalloc):
+		tracemalloc.start()
+		reader(s, tags)
+		peak = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+	return t, peak, r
+
+def main():
+	parser = ArgumentParser(description='Benchmarks streaming XML tag reads against full parsing.')
+	parser.add_argument('--settings', type=int, default=50000, help='setting elements in the fixture')
+	parser.add_argument('--iterations', type=int, default=5, help='reads timed per reader')
+	args = parser.parse_args()
+	root = mkdtemp(prefix='casper-xml-')
+	try:
+		s = root + '/etc/cma.d/EPOAGENT3700MACX/config.xml'
+		build_agent_xml(s, args.settings)
+		print('fixture: %.1f MB' % (getsize(s) / 1048576.0))
+		for tags in (['Version'], ['GUID'], ['Version', 'GUID']):
+			Results = []
+			for reader in (read_full, read_streaming):
+				t, peak, r = measure(reader, s, tags, args.iterations)
+				Results.append(r)
+				print('%-13s %-15s %8.2fms per read  %s KB peak allocated' % ('+'.join(tags), reader.__name__, 1000 * t, '%.1f' % (peak / 1024.0) if peak is not None else 'n/a'))
+			print('%-13s results match: %s' % ('+'.join(tags), Results[0] == Results[1]))
+	finally:
+		rmtree(root)
+
+if __name__ == '__main__':
+	main()
@@ -14,117 +14,23 @@ Returns 'N/A' if the product is not found.
 Command = '/Library/McAfee/agent/bin/msaconfig'
 # Additional arguments [optional]
 # Arguments = ['ARG1', 'ARG2', 'ARG3', ...]
+# Seconds the command may run before it is stopped [optional]
+# Timeout = SECONDS
 # Version to test for [required]
 Version = '5.0.2.132'
 # Range limit for plist version [optional]
 # Range = ['MIN', 'MAX']
 
 # Required modules
-from os import access, devnull, X_OK
-from pkg_resources import parse_version
-from re import sub
-from subprocess import check_output
-
-# Read Key's Value as String from Plist
-def execute_command(cmd):
-	with open(devnull, 'w') as DEVNULL:
-		try:
-			v = check_output(cmd, stderr=DEVNULL).rstrip()
-		except:
-			v = ''
-	return v
-
-# Rationalise Version String
-def rationalise_version(v):
-	# Convert to lowercase
-	v = v.lower()
-	# Remove leading non-numeric characters
-	v = sub('^[^0-9]*', '', v)
-	# Remove trailing spaces
-	v = sub(' *$', '', v)
-	# Replace commas with periods
-	v = sub(',', '.', v)
-	# Remove 'dodgy' characters
-	v = sub('[^a-z0-9 .-]', '', v)
-	return v
-
-# Compare Version Strings
-def compare_versions(v1, v2):
-	if (parse_version(v1) < parse_version(v2)):
-		r = 'Older'
-	elif (parse_version(v1) == parse_version(v2)):
-		r = 'Equal'
-	elif (parse_version(v1) > parse_version(v2)):
-		r = 'Newer'
-	return r
-
-# Version in Range
-def version_in_range(v, r):
-	r = parse_version(r[1]) > parse_version(v) >= parse_version(r[0])
-	return r
-
-# Initialise variables
+from sys import path
+path.insert(0, '/Library/Application Support/Casper')
 try:
-	Command
-except:
-	print '<result>Error: Command not defined</result>'
+	from casper.products import read_header
+	from casper.runner import result
+except ImportError:
+	print '<result>Error: Casper runtime not installed</result>'
 	exit(1)
-try:
-	Arguments
-except:
-	Arguments = []
-try:
-	Version
-except:
-	print '<result>Error: No Version specified</result>'
-	exit(1)
-try:
-	Range
-except:
-	Range = None
-
-# Validate Version
-Version = rationalise_version(Version)
-if (Version == ''):
-	print '<result>Error: Version is invalid</result>'
-	exit(1)
-
-# Validate Range
-if (Range):
-	if (len(Range) != 2):
-		print '<result>Error: Range requires two values</result>'
-		exit(1)
-	else:
-		Range[0] = rationalise_version(Range[0])
-		if (Range[0] == ''):
-			print '<result>Error: Range minimum is invalid</result>'
-			exit(1)
-		Range[1] = rationalise_version(Range[1])
-		if (Range[1] == ''):
-			print '<result>Error: Range maximum is invalid</result>'
-			exit(1)
-		if (compare_versions(Range[0], Range[1]) != 'Older'):
-			print '<result>Error: Range minimum is greater than maximum</result>'
-			exit(1)
-		if (version_in_range(Version, Range) == False):
-			print '<result>Error: Version is not within Range</result>'
-			exit(1)
-
-# Check Installed Version
-if (not access(Command, X_OK)):
-	Result = 'N/A'
-else:
-	Command = ['/bin/bash', '-c', Command] + Arguments
-	Installed = execute_command(Command)
-	Installed = rationalise_version(Installed)
-	if (Installed == ''):
-		Result = 'Error: Reading installed version'
-	else:
-		Result = compare_versions(Installed, Version)
-		if (Range):
-			if (version_in_range(Installed, Range) == False):
-				Result = 'N/A'
 
-# Output Result
-print '<result>' + Result + '</result>'
-exit(0)
\ No newline at end of file
+# Output result from the inventory runner, passing the header constants above in case they were edited in the JSS or aren't in its manifest yet
+print '<result>' + result('Version McAfee EPO Agent 5', header=read_header(__file__), template='CMD') + '</result>'
+exit(0)
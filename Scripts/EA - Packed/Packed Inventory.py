@@ -0,0 +1,25 @@
+#!/usr/bin/python
+
+"""
+Reports the results of every product in one string, so one Extension Attribute replaces one per product.
+Returns |key=Result|key=Result|... sorted by key, where a product's key is its name in lowercase letters and digits without the 'Version ' prefix, e.g. |googlechrome=Equal|mozillafirefox=Older|.
+Each Result is 'Older', 'Equal', 'Newer', 'N/A' or 'Error', as the product's own Extension Attribute would return it, with every error reported as 'Error'.
+Smart groups match a product's result with 'like' on |key=Result|; Scripts/Tools/BuildSmartGroups.py writes their criteria.
+A Category may (optionally) be specified to report only the products whose scripts are in 'EA - Category', e.g. 'Bundle'.
+"""
+
+# Category of the products to report, or None for every product [optional]
+Category = None
+
+# Required modules
+from sys import path
+path.insert(0, '/Library/Application Support/Casper')
+try:
+	from casper.runner import packed
+except ImportError:
+	print '<result>Error: Casper runtime not installed</result>'
+	exit(1)
+
+# Output packed results from the inventory runner
+print '<result>' + packed(Category) + '</result>'
+exit(0)
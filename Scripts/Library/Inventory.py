@@ -0,0 +1,11 @@
+#!/usr/bin/python
+
+"""
+Evaluates every Extension Attribute product in one interpreter and writes the results for the Extension Attribute scripts to read.
+Run before recon (e.g. from a policy) so every Extension Attribute is answered from the results without evaluating anything.
+"""
+
+# Required modules
+from casper.runner import main
+
+main()
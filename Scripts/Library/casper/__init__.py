@@ -0,0 +1,23 @@
+"""
+Casper Extension Attribute runtime.
+Evaluates the product definitions of every Extension Attribute in a single interpreter, so discovery, parsing and comparison work is shared across products.
+The runtime is installed on clients in /Library/Application Support/Casper, which Extension Attribute scripts add to their module search path.
+"""
+
+# Required modules
+from os.path import dirname, join
+
+# Folder the runtime is installed in on clients
+Support = '/Library/Application Support/Casper'
+# Manifest of product definitions, built from the Extension Attribute scripts
+Manifest = join(dirname(__file__), 'products.json')
+# Results written by the inventory runner
+Results = Support + '/Results.json'
+# Bundle index kept between runs
+Index = Support + '/Index.json'
+# Snapshot of the Adobe pdb.db payloads, rebuilt when the database changes
+Pdb = Support + '/Pdb.json'
+# Output of Extension Attribute commands, cached until their executables change
+Commands = Support + '/Commands.json'
+# Results of delta runs, with the inputs that produced them
+Delta = Support + '/Delta.json'
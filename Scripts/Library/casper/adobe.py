@@ -0,0 +1,122 @@
+"""
+Queries the Adobe pdb.db database for the ADOBE_PDB template.
+The database is opened read-only once per run, and the payloads table is read in one pass into a map of productName to versions.
+Every product is then answered from that map, matching productName as the template's LIKE query did: case-insensitively, with '_' and '%' as wildcards.
+The map is kept in a JSON snapshot keyed on the database's (st_ino, st_size, st_mtime), so while pdb.db is unchanged it is never opened and sqlite3 is never imported.
+"""
+
+# Required modules
+from bisect import bisect_left
+from os import stat
+from os.path import exists
+from re import compile, escape
+from casper import Pdb
+from casper.files import read_json, write_json
+from casper.timing import timed
+try:
+	from urllib.parse import quote
+except ImportError:
+	from urllib import quote
+try:
+	unichr
+except NameError:
+	unichr = chr
+
+# Snapshot file, or None to read the database every run
+Snapshot = Pdb
+# Payload versions of each database, keyed by database path, then by lowercase productName
+Payloads = {}
+# Sorted lowercase productNames of each database, keyed by database path
+Names = {}
+
+# Open a database read-only, and as immutable when no installer is writing to it
+def open_db(db):
+	# Imported here, so runs served from the snapshot never import sqlite3
+	from sqlite3 import connect
+	uri = 'file:' + quote(db) + '?mode=ro'
+	if (not exists(db + '-journal') and not exists(db + '-wal')):
+		uri += '&immutable=1'
+	try:
+		c = connect(uri, uri=True)
+	except TypeError:
+		# Python 2's sqlite3 can't open URIs, so the connection refuses writes instead
+		c = connect(db)
+		c.execute('PRAGMA query_only = ON')
+	return c
+
+# Read every payload's productName and version from a database, returning None if it can't be read
+def read_db(db):
+	r = {}
+	try:
+		c = open_db(db)
+		try:
+			for Name, Version in c.execute('SELECT productName, version FROM payloads'):
+				if (Name is not None and Version is not None):
+					r.setdefault(Name.lower(), []).append(Version.encode('ascii', 'ignore').decode('ascii'))
+		finally:
+			c.close()
+	except Exception:
+		r = None
+	return r
+
+# Read the payloads of a database from its snapshot, rebuilding the snapshot if the database changed
+def read_snapshot(db):
+	try:
+		s = stat(db)
+	except OSError:
+		return {}
+	Stat = [s.st_ino, s.st_size, s.st_mtime]
+	d = read_json(Snapshot)
+	if (isinstance(d, dict) and db in d and d[db].get('Stat') == Stat):
+		return d[db]['Payloads']
+	r = read_db(db)
+	if (r is None):
+		return {}
+	if (not isinstance(d, dict)): d = {}
+	d[db] = {'Stat': Stat, 'Payloads': r}
+	try:
+		write_json(d, Snapshot)
+	except (IOError, OSError):
+		pass
+	return r
+
+# Payloads of a database, read once per run
+@timed('read_pdb')
+def read_payloads(db):
+	if (not db in Payloads):
+		if (Snapshot):
+			r = read_snapshot(db)
+		else:
+			r = read_db(db) or {}
+		Payloads[db] = r
+		Names[db] = sorted(r)
+	return Payloads[db]
+
+# Regular expression matching what a LIKE pattern matches
+def like(pattern):
+	r = compile('(?s)' + ''.join('.' if a == '_' else '.*' if a == '%' else escape(a) for a in pattern.lower()) + '$')
+	return r
+
+# Lowercase productNames matching a LIKE pattern
+def matching(db, pattern):
+	pattern = pattern.lower()
+	if (not '_' in pattern and not '%' in pattern):
+		return [pattern] if pattern in read_payloads(db) else []
+	# Only names starting with the pattern's literal prefix can match
+	prefix = pattern[:min(pattern.find(a) if a in pattern else len(pattern) for a in '_%')]
+	read_payloads(db)
+	r = like(pattern)
+	a = Names[db]
+	if (prefix):
+		a = a[bisect_left(a, prefix):bisect_left(a, prefix[:-1] + unichr(ord(prefix[-1]) + 1))]
+	Matches = list(filter(r.match, a))
+	return Matches
+
+# Search for productName in pdb
+@timed('query_pdb')
+def query_db_product(db, product, payload):
+	Versions = read_payloads(db)
+	r = []
+	for Name in sorted(set(matching(db, product) + matching(db, product + '_%_' + str(payload)))):
+		r.extend(Versions[Name])
+	return r
@@ -0,0 +1,119 @@
+"""
+Renders the Extension Attribute scripts and their XML upload files from product definitions and the templates in Scripts/EA - Templates.
+A product's script is its template with the product's header constants filled in; optional constants the product doesn't set stay commented out.
+The packed Extension Attribute scripts in Scripts/EA - Packed are written by hand, and only their XML files are rendered.
+Its XML file wraps the script, entity-encoded with &#13; line endings as the JSS exports it, with the product's name and the description of its template.
+Rendered files are only rewritten when the hash of their content changes, so an unchanged tree is left untouched.
+"""
+
+# Required modules
+from hashlib import sha1
+from io import open
+from itertools import takewhile
+from os import makedirs
+from os.path import dirname, exists, join
+from re import compile
+from xml.etree.ElementTree import iterparse
+from casper.products import Folders, header_span
+
+# Folder of the scripts of each template
+Scripts = dict((t, f) for f, t in Folders.items() if t != 'CUSTOM')
+Scripts.update({'CUSTOM-AdobeGamingSDK': 'EA - Custom', 'CUSTOM-JAMF': 'EA - Custom'})
+# Folder of the packed Extension Attribute scripts, which are written by hand rather than rendered from a template
+Packed = 'EA - Packed'
+# Header line assigning a constant, commented out when the constant is optional
+Constant = compile(r'^(?:# )*(\w+) = ')
+# XML upload file of an Extension Attribute
+Xml = '''<?xml version="1.0" encoding="UTF-8"?>
+<extensionAttribute>
+<displayName>%s</displayName>
+<description>%s</description>
+<dataType>string</dataType>
+<scriptContentsMac>%s</scriptContentsMac>
+<scriptContentsWindows/>
+</extensionAttribute>
+'''
+
+# Path of a template, under the Scripts folder
+def template_path(root, t):
+	r = join(root, 'EA - Templates', 'Version ' + t + '.py')
+	return r
+
+# Paths of a product's script, under the Scripts folder, and of its XML file, under the Extension Attributes folder next to it
+def paths(root, p):
+	Folder = Scripts[p['Template']]
+	r = (join(root, Folder, p['Name'] + '.py'), xml_path(root, Folder, p['Name']))
+	return r
+
+# Path of the XML file of a script in a folder, under the Extension Attributes folder next to the Scripts folder
+def xml_path(root, Folder, Name):
+	r = join(dirname(root), 'Extension Attributes', Folder[len('EA - '):], Name + '.xml')
+	return r
+
+# Python literal of a header constant, as the scripts write it
+def literal(v):
+	if (isinstance(v, list)):
+		return '[' + ', '.join(literal(i) for i in v) + ']'
+	if (isinstance(v, (int, float))):
+		return str(v)
+	return "'" + v.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+# Render a product's script from its template
+def render_script(p, t):
+	a, b = header_span(t)
+	Lines = []
+	for l in t[a:b].split('\n'):
+		m = Constant.match(l)
+		if (m and m.group(1) in p): l = m.group(1) + ' = ' + literal(p[m.group(1)])
+		Lines.append(l)
+	s = t[:a] + '\n'.join(Lines) + t[b:].replace("result('NAME'", 'result(' + literal(p['Name']))
+	return s.rstrip('\n') + '\n'
+
+# Description of a script: the first line of its docstring, and any caveat on its results following it
+def description(s):
+	Lines = s[s.find('"""') + 3:].strip('\n').split('\n')
+	r = '\n'.join([Lines[0]] + list(takewhile(lambda l: l.startswith('Due to '), Lines[1:])))
+	return r
+
+# Escape text for the XML file, with the &#13; line endings of a JSS export
+def escape(s):
+	r = s.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('\n', '&#13;\n')
+	return r
+
+# Normalise the line endings of a script read from an XML file
+def normalise(s):
+	r = s.replace('\r\n', '\n').replace('\r', '\n')
+	return r
+
+# Render a product's XML file around its script
+def render_xml(p, s):
+	r = Xml % (escape(p['Name']), escape(description(s)), escape(s))
+	return r
+
+# Read the script from an XML file, streaming it only as far as the scriptContentsMac tag, returning None if it has none
+def read_xml_script(f):
+	r = None
+	with open(f, 'rb') as i:
+		for event, e in iterparse(i):
+			if (e.tag == 'scriptContentsMac'):
+				r = normalise(e.text or '')
+				break
+	return r
+
+# Hash of a file's content, or None if it doesn't exist
+def digest(f):
+	if (not exists(f)):
+		return None
+	with open(f, 'rb') as i:
+		r = sha1(i.read()).hexdigest()
+	return r
+
+# Write content to a file unless it already holds it, returning whether it was written
+def update(f, s):
+	b = s.encode('utf-8')
+	if (digest(f) == sha1(b).hexdigest()):
+		return False
+	if (not exists(dirname(f))): makedirs(dirname(f))
+	with open(f, 'wb') as o:
+		o.write(b)
+	return True
@@ -0,0 +1,145 @@
+"""
+Finds bundles by CFBundleIdentifier for the BUNDLE and CUSTOM templates.
+The identifiers of every product are searched for with one Spotlight query, and the results are split by identifier locally.
+When Spotlight is disabled the filesystem is crawled instead (see casper.crawler).
+Bundles are told apart by device and inode rather than path, so a bundle reached through a Default path, a symlink or a firmlink such as /System/Volumes/Data is only read once.
+Only bundles on the volumes a product's Volumes policy searches are read (see casper.volumes).
+Search results and the Spotlight status are memoised, so they are shared by every product in a run.
+Bundles found are also kept in the bundle index (see casper.cache), and reused by later runs while their folders are unchanged.
+So are identifiers no bundle was found for, while the watched folders (the crawler's roots and their subfolders) are unchanged, and the Spotlight status, so a product that isn't installed costs no subprocesses on later runs.
+A Spotlight search that fails or times out finds nothing for this run only: neither its bundles nor its absent identifiers are kept, and its products report an error rather than a result from the bundles found without it.
+"""
+
+# Required modules
+from fnmatch import fnmatchcase
+from glob import glob
+from os.path import basename, exists
+from threading import Lock
+from casper import cache, crawler, volumes
+from casper.command import execute_command, run_command
+from casper.timing import timed
+
+# Discovery backend: 'spotlight', 'crawler', or 'auto' to crawl when Spotlight is disabled
+Backend = 'auto'
+# Spotlight search and status commands
+Mdfind = '/usr/bin/mdfind'
+Mdutil = '/usr/bin/mdutil'
+# Subfolders of the crawler's roots not watched for new bundles, as they change for other reasons
+Unwatched = crawler.Prune | set(['Preferences'])
+# Search results, keyed by CFBundleIdentifier and Volumes policy (see key())
+Found = {}
+# Keys whose Spotlight search failed this run
+Unsearched = set()
+# Spotlight status of the boot volume, read on first use
+Status = []
+lock = Lock()
+
+# Spotlight query matching a CFBundleIdentifier
+def query(id):
+	q = 'kMDItemCFBundleIdentifier == "' + id + '"'
+	return q
+
+# Identifier matches a (possibly wildcard) CFBundleIdentifier
+def matches(v, id):
+	r = v == id or ('*' in id and fnmatchcase(v, id))
+	return r
+
+# Key of the bundles found for an identifier on the volumes searched under a Volumes policy
+def key(id, policy):
+	r = id if (policy == 'local') else policy + ':' + id
+	return r
+
+# Find bundles for many identifiers with one Spotlight query, splitting the results by identifier
+@timed('discover')
+def discover(ids, policy='local'):
+	ids = sorted(set(id for id in ids if not key(id, policy) in Found))
+	# Reuse the bundles found by a previous run where their folders haven't changed
+	for id in ids:
+		Bundles = cache.found(key(id, policy))
+		if (Bundles is not None): Found[key(id, policy)] = Bundles
+		# Nor search for identifiers no bundle was found for, while the watched folders are unchanged
+		elif (cache.absent(key(id, policy))): Found[key(id, policy)] = []
+	ids = [id for id in ids if not key(id, policy) in Found]
+	if (len(ids) == 0):
+		return
+	Bundles = dict((id, []) for id in ids)
+	if (crawling()):
+		Results = [(Bundle, v) for v in sorted(crawler.index()) for Bundle in crawler.index()[v]]
+	else:
+		Results = search(ids)
+	# A failed search isn't kept, so the next run searches again
+	if (Results is None):
+		for id in ids:
+			Found[key(id, policy)] = []
+			Unsearched.add(key(id, policy))
+		return
+	# Results on volumes the policy doesn't search are dropped by their path, before they are touched
+	Results = volumes.searched(Results, policy)
+	for Bundle, v in Results:
+		for id in ids:
+			if (matches(v, id)): Bundles[id].append(Bundle)
+	for id in ids:
+		Found[key(id, policy)] = cache.unique(Bundles[id])
+		cache.set_found(key(id, policy), Found[key(id, policy)])
+	cache.set_absent([key(id, policy) for id in ids if len(Bundles[id]) == 0], watched(policy))
+
+# Folders whose changes may mean a missing bundle was installed: the crawler's roots on the volumes a policy searches, and their subfolders
+def watched(policy='local'):
+	r = []
+	for d in crawler.Roots:
+		for Root in sorted(glob(d)):
+			if (not volumes.classify(Root) in volumes.Policies[policy]): continue
+			r.append(Root)
+			r.extend(sorted(f for f, dev in crawler.list_folders(Root, False) if not basename(f) in Unwatched and not basename(f).startswith('.')))
+	return r
+
+# Search Spotlight for identifiers, returning the path and CFBundleIdentifier of each result, or None if mdfind failed
+def search(ids):
+	r = []
+	q = ' || '.join(query(id) for id in ids)
+	o = run_command([Mdfind, '-attr', 'kMDItemCFBundleIdentifier', q])
+	if (o is None):
+		return None
+	for l in o.split('\n'):
+		# Each result is printed as the path followed by the attribute's value
+		Bundle, s, v = l.rpartition(' kMDItemCFBundleIdentifier = ')
+		if (s): r.append((Bundle.rstrip(), v.strip().strip('"')))
+	return r
+
+# Spotlight search for an identifier failed this run, so finding no bundles for it means nothing
+def unsearched(id, policy='local'):
+	r = key(id, policy) in Unsearched
+	return r
+
+# Find Bundles with identifier on the volumes searched under a Volumes policy
+@timed('find_bundles')
+def find_bundles(id, policy='local'):
+	if (not key(id, policy) in Found):
+		discover([id], policy)
+	return Found[key(id, policy)]
+
+# Find Bundles with identifier, checking the Default path first
+def find_bundles_default(id, Default, policy='local'):
+	Bundles = []
+	# Test Default path, add bundle to array if it exists
+	if (Default):
+		if (exists(Default)): Bundles.append(Default)
+	# Search for bundles and add to array, keeping one path to each bundle
+	return cache.unique(Bundles + find_bundles(id, policy))
+
+# Bundles are found by crawling rather than with Spotlight
+def crawling():
+	r = Backend == 'crawler' or (Backend == 'auto' and spotlight_disabled())
+	return r
+
+# Spotlight Disabled on the boot volume
+@timed('mdutil')
+def spotlight_disabled():
+	with lock:
+		if (not Status):
+			s = cache.spotlight()
+			if (s is None):
+				s = execute_command([Mdutil, '-s', '/'])
+				if (s): cache.set_spotlight(s)
+			Status.append(s)
+	return 'disabled' in Status[0]
@@ -0,0 +1,218 @@
+"""
+Keeps the bundle index between runs, so a run only re-reads what changed since the previous one.
+Bundles are recorded with their Info.plist path and the values read from it, crawled folders with their subfolders, and Spotlight results with the bundles found for each CFBundleIdentifier.
+Identifiers no bundle was found for are recorded too, against the signatures of the watched application folders, as are the Spotlight status of the boot volume and the mount table, so a run finding nothing new spawns no subprocesses.
+Each entry is keyed on the (st_dev, st_ino, st_mtime) of what it was read from: a bundle, its parent folder and its Info.plist, or a crawled folder.
+A later run re-stats only that directory spine and re-reads the entries whose signature changed.
+The index is written atomically when a run ends. When runs overlap, the last to finish wins, which only costs the other run's new entries.
+"""
+
+# Required modules
+from os import stat
+from os.path import dirname, isfile
+from threading import Lock
+from time import time
+from casper import Index
+from casper.files import read_json, write_json
+from casper.plists import read_plist
+from casper.timing import timed
+
+# Index file, or None to keep the index in memory only
+Path = Index
+# Seconds Spotlight results are reused for, before Spotlight is searched again
+MaxAge = 86400
+# Seconds identifiers no bundle was found for are trusted for, even while no watched folder changes
+MaxAbsent = 86400
+# Seconds the Spotlight status and the mount table are reused for
+MaxStatus = 3600
+# Entries of the index, loaded on first use
+State = {}
+# Whether the identifiers recorded as absent are still valid, checked once per run
+Checked = []
+# Entries changed since the index was loaded
+Changed = []
+# Identities of paths, keyed by path, read once per run
+Identities = {}
+# First path seen to each identity this run, which every later path to it is replaced with
+Canonical = {}
+# Lock of each bundle, so products reading it concurrently wait for one read rather than repeating it
+Locks = {}
+# Guards State, as threads given up on by the scheduler may still be adding entries while it is saved
+lock = Lock()
+
+# Signature of a path: its device, inode and modification time
+def signature(p):
+	try:
+		s = stat(p)
+	except OSError:
+		return None
+	return [s.st_dev, s.st_ino, s.st_mtime]
+
+# Identity of what a path leads to: its device and inode, shared by every symlink or firmlink to it, or the path itself if it is missing
+def identity(p):
+	try:
+		r = Identities[p]
+	except KeyError:
+		s = signature(p)
+		r = Identities[p] = (s[0], s[1]) if s else p
+	return r
+
+# Paths leading to distinct files or folders, in order, each replaced by the first path seen to it this run
+def unique(Paths):
+	Seen = set()
+	r = []
+	for p in Paths:
+		p = Canonical.setdefault(identity(p), p)
+		if (not p in Seen):
+			Seen.add(p)
+			r.append(p)
+	return r
+
+# Entries of the index, loading them on first use
+def state():
+	if (not State):
+		d = None
+		if (Path): d = read_json(Path)
+		if (not isinstance(d, dict) or d.get('Version') != 1): d = {'Version': 1}
+		for k in ('Absent', 'Bundles', 'Folders', 'Found', 'Mounts', 'Spotlight'):
+			d.setdefault(k, {})
+		with lock:
+			State.update(d)
+	return State
+
+# Write the index if it changed, holding the lock so no entry changes mid-write
+def save():
+	if (Changed and Path):
+		with lock:
+			try:
+				write_json(State, Path)
+			except (IOError, OSError):
+				pass
+	del Changed[:]
+
+# List a folder with a lister, reusing the previous listing if the folder hasn't changed
+def read_folder(d, lister):
+	sig = signature(d)
+	e = state()['Folders'].get(d)
+	if (e and sig and e[0] == sig):
+		return [tuple(a) for a in e[1]]
+	r = lister(d)
+	if (sig):
+		with lock:
+			State['Folders'][d] = [sig, r]
+		Changed.append(d)
+	return r
+
+# Record of a bundle, found again if the bundle, its parent folder or its Info.plist changed
+@timed('bundle_index')
+def bundle(Bundle):
+	sig = [signature(Bundle), signature(dirname(Bundle))]
+	e = state()['Bundles'].get(Bundle)
+	if (e and e['Stat'][:2] == sig and (e['Plist'] is None or e['Stat'][2] == signature(e['Plist']))):
+		return e
+	Plist = None
+	for p in (Bundle + '/Contents/Info.plist', Bundle + '/Resources/Info.plist'):
+		if (isfile(p)):
+			Plist = p
+			break
+	e = {'Stat': sig + [signature(Plist) if Plist else None], 'Plist': Plist, 'Values': {}}
+	with lock:
+		if (sig[0]):
+			State['Bundles'][Bundle] = e
+		else:
+			State['Bundles'].pop(Bundle, None)
+	Changed.append(Bundle)
+	return e
+
+# Read a key from a bundle's Info.plist, returning the Info.plist path (None without one) and the value
+def read_bundle(Bundle, Key):
+	with Locks.setdefault(Bundle, Lock()):
+		e = bundle(Bundle)
+		if (e['Plist'] is None):
+			return None, ''
+		if (not Key in e['Values']):
+			v = read_plist(e['Plist'], Key)
+			with lock:
+				e['Values'][Key] = v
+			Changed.append(Bundle)
+	return e['Plist'], e['Values'][Key]
+
+# Bundles found for an identifier by a previous run, unless they are too old or a parent folder changed
+def found(id):
+	e = state()['Found'].get(id)
+	if (not e or time() - e['Time'] > MaxAge):
+		return None
+	for d, sig in e['Spine']:
+		if (signature(d) != sig):
+			return None
+	return list(e['Bundles'])
+
+# Record the bundles found for an identifier with the signatures of their parent folders (see set_absent for identifiers without any)
+def set_found(id, Bundles):
+	if (len(Bundles) == 0):
+		return
+	Spine = [[d, signature(d)] for d in sorted(set(dirname(Bundle) for Bundle in Bundles))]
+	e = {'Time': time(), 'Bundles': list(Bundles), 'Spine': Spine}
+	d = state()
+	with lock:
+		d['Found'][id] = e
+	Changed.append(id)
+
+# The identifiers absent from the watched folders remain valid, unless they are too old or a watched folder changed
+def absent_valid():
+	if (not Checked):
+		e = state()['Absent']
+		Checked.append(bool(e) and time() - e['Time'] <= MaxAbsent and all(signature(d) == sig for d, sig in e['Spine']))
+	return Checked[0]
+
+# Identifier had no bundles found for it by a previous run, and no watched folder has changed since
+def absent(id):
+	r = absent_valid() and id in state()['Absent']['Ids']
+	return r
+
+# Record identifiers no bundle was found for, with the signatures of the watched folders when none were recorded yet
+def set_absent(ids, Watched):
+	if (len(ids) == 0):
+		return
+	e = state()['Absent']
+	Valid = absent_valid()
+	with lock:
+		if (not Valid):
+			e.clear()
+			e.update({'Time': time(), 'Spine': [[d, signature(d)] for d in Watched], 'Ids': []})
+			Checked[:] = [True]
+		# Folders watched for another Volumes policy join the spine
+		Known = set(d for d, sig in e['Spine'])
+		e['Spine'].extend([d, signature(d)] for d in Watched if not d in Known)
+		e['Ids'] = sorted(set(e['Ids']) | set(ids))
+	Changed.append('Absent')
+
+# Spotlight status recorded by a previous run, unless it is too old
+def spotlight():
+	e = state()['Spotlight']
+	if (not e or time() - e['Time'] > MaxStatus):
+		return None
+	return e['Status']
+
+# Record the Spotlight status
+def set_spotlight(s):
+	e = {'Time': time(), 'Status': s}
+	d = state()
+	with lock:
+		d['Spotlight'] = e
+	Changed.append('Spotlight')
+
+# Mount table recorded by a previous run, unless it is too old or a volume was mounted or unmounted in Folder since
+def mounts(Folder):
+	e = state()['Mounts']
+	if (not e or e['Folder'] != Folder or time() - e['Time'] > MaxStatus or signature(Folder) != e['Stat']):
+		return None
+	return e['Mounts']
+
+# Record the mount table, with the signature of the folder volumes are mounted in
+def set_mounts(Folder, Mounts):
+	e = {'Time': time(), 'Folder': Folder, 'Stat': signature(Folder), 'Mounts': Mounts}
+	d = state()
+	with lock:
+		d['Mounts'] = e
+	Changed.append('Mounts')
@@ -0,0 +1,138 @@
+"""
+Runs external commands for the templates, returning their output as a string.
+Commands are executed directly rather than through a shell, and are stopped if they run longer than a timeout.
+The output of the CMD template's commands is cached against the executable's (st_ino, st_size, st_mtime), and optionally its code signature, so a command only runs again when its binary changes or its cached output expires.
+"""
+
+# Required modules
+from os import devnull, killpg, stat
+from os.path import realpath
+from signal import SIGKILL
+from subprocess import PIPE, Popen
+from sys import version_info
+from threading import Lock, Thread
+from time import time
+from casper import Commands
+from casper.files import read_json, write_json
+from casper.timing import timed
+
+# Seconds a command may run before it is stopped
+Timeout = 60
+# Cache file of command output, or None to run commands every time
+Path = Commands
+# Seconds cached command output is served for
+MaxAge = 86400
+# Also check the executable's code signature before serving cached output
+VerifySignature = False
+Codesign = '/usr/bin/codesign'
+# Cached command output, loaded on first use
+Cached = {}
+# Guards Cached, as commands run on the scheduler's threads while it is written out
+lock = Lock()
+# Each command leads its own process group, so a timeout stops its children too
+# Python 2's Popen can only start a session with preexec_fn, which can deadlock a child forked while other threads run, so there commands share ours and a timeout stops only the command
+if (version_info >= (3, 2)):
+	Session = {'start_new_session': True}
+else:
+	Session = {}
+
+# Stop a command, and any processes it started where it leads its own session
+def stop(p):
+	try:
+		if (Session):
+			killpg(p.pid, SIGKILL)
+		else:
+			p.kill()
+	except OSError:
+		pass
+
+# Read a command's output on a thread, as Python 2's communicate() has no timeout, returning None if it ran past its timeout
+# Processes the command started may still hold its output open once it is stopped, so the thread is left to finish with them
+def communicate_thread(p, timeout):
+	o = []
+	t = Thread(target=lambda: o.append(p.communicate()[0]))
+	t.daemon = True
+	t.start()
+	t.join(timeout)
+	if (t.is_alive()):
+		stop(p)
+		return None
+	return o[0] if o else None
+
+# Execute Command, returning its output, or None if it failed or ran past its timeout
+@timed('command')
+def run_command(cmd, timeout=None):
+	with open(devnull, 'w') as DEVNULL:
+		try:
+			# Children don't inherit each other's pipes, so communicate() only waits on its own
+			p = Popen(cmd, stdout=PIPE, stderr=DEVNULL, close_fds=True, **Session)
+		except (IOError, OSError):
+			return None
+		try:
+			o = p.communicate(timeout=timeout or Timeout)[0]
+		except TypeError:
+			o = communicate_thread(p, timeout or Timeout)
+		except Exception:
+			# The command ran past its timeout
+			stop(p)
+			p.communicate()
+			return None
+	if (o is None or p.returncode != 0):
+		return None
+	v = o.decode('utf-8', 'replace').rstrip()
+	return v
+
+# Execute Command, returning its output or an empty string on failure
+def execute_command(cmd, timeout=None):
+	v = run_command(cmd, timeout)
+	if (v is None): v = ''
+	return v
+
+# Code directory hash of an executable's signature, or '' if it isn't signed
+def signature_hash(f):
+	with open(devnull, 'w') as DEVNULL:
+		try:
+			e = Popen([Codesign, '--display', '--verbose=3', f], stdout=DEVNULL, stderr=PIPE, close_fds=True).communicate()[1]
+		except (IOError, OSError):
+			return ''
+	# codesign prints the signature details to stderr
+	for l in e.decode('utf-8', 'replace').splitlines():
+		if (l.startswith('CDHash=')):
+			return l[len('CDHash='):]
+	return ''
+
+# Identity of an executable: its inode, size and modification time, and its code signature if verified
+def identity(f):
+	try:
+		s = stat(f)
+	except OSError:
+		return None
+	r = [s.st_ino, s.st_size, s.st_mtime]
+	if (VerifySignature):
+		r.append(signature_hash(realpath(f)))
+	return r
+
+# Output of a command, served from the cache while the executable is unchanged and the output younger than MaxAge
+def read_command(Command, Arguments=(), timeout=None):
+	Arguments = list(Arguments)
+	if (not Path):
+		return execute_command([Command] + Arguments, timeout)
+	with lock:
+		if (not Cached):
+			Cached.update(read_json(Path) or {})
+	k = '\0'.join([Command] + Arguments)
+	Identity = identity(Command)
+	e = Cached.get(k)
+	if (e and e['Identity'] == Identity and time() - e['Time'] <= MaxAge):
+		return e['Output']
+	v = execute_command([Command] + Arguments, timeout)
+	# Failures aren't cached, so the command is tried again next run
+	# The cache is written under the lock, so no other command changes it mid-write
+	if (v and Identity):
+		with lock:
+			Cached[k] = {'Identity': Identity, 'Output': v, 'Time': time()}
+			try:
+				write_json(Cached, Path)
+			except (IOError, OSError):
+				pass
+	return v
@@ -0,0 +1,111 @@
+"""
+Finds bundles by crawling the filesystem, for hosts where Spotlight is disabled.
+Folders are listed by a pool of worker threads, one folder level at a time.
+Bundles (.app, .framework and .plugin folders) are not descended into, other than to read the CFBundleIdentifier from their Info.plist.
+The crawl builds an index of CFBundleIdentifier to bundle paths, which is crawled once and shared by every product in a run.
+"""
+
+# Required modules
+from glob import glob
+from multiprocessing.pool import ThreadPool
+from os import listdir, lstat
+from os.path import join
+from stat import S_ISDIR
+from threading import Lock
+from casper import volumes
+from casper.cache import read_bundle, read_folder, unique
+try:
+	from os import scandir
+except ImportError:
+	scandir = None
+
+# Folders crawled for bundles
+Roots = ['/Applications', '/Library', '/Users/*/Applications', '/opt']
+# Extensions of the bundles indexed
+Extensions = ('.app', '.framework', '.plugin')
+# Names of folders never descended into
+Prune = set([
+	'.DocumentRevisions-V100', '.Spotlight-V100', '.Trashes', '.fseventsd',
+	'Caches', 'Containers', 'Logs', 'Mail', 'Messages', 'Photos Library.photoslibrary', 'node_modules',
+])
+# Deepest folder level crawled below a root
+MaxDepth = 10
+# Worker threads listing folders and reading Info.plists
+Workers = 8
+# Stay on the filesystem of each root, skipping other volumes mounted below it
+OneFilesystem = False
+# Index of CFBundleIdentifier to bundle paths, crawled on first use
+Index = {}
+Crawled = []
+lock = Lock()
+
+# List the subfolders of a folder, returning their paths and device ids, without following symlinks
+def list_folders(d, devices):
+	r = []
+	try:
+		if (scandir):
+			for e in scandir(d):
+				if (e.is_dir(follow_symlinks=False)):
+					r.append((e.path, e.stat(follow_symlinks=False).st_dev if devices else None))
+		else:
+			for n in listdir(d):
+				s = lstat(join(d, n))
+				if (S_ISDIR(s.st_mode)):
+					r.append((join(d, n), s.st_dev))
+	except (IOError, OSError):
+		pass
+	return r
+
+# Scan a folder, returning the folders to crawl and the bundles in it
+def scan(d, device, prune=Prune):
+	Folders = []
+	Bundles = []
+	for f, dev in read_folder(d, lambda d: list_folders(d, True)):
+		n = f[len(d) + 1:]
+		if (n in prune or n.startswith('.')): continue
+		if (device is not None and dev != device): continue
+		if (n.endswith(Extensions)):
+			Bundles.append(f)
+		else:
+			Folders.append(f)
+	return Folders, Bundles
+
+# Read a bundle's CFBundleIdentifier from its Info.plist, through the bundle index
+def read_identifier(Bundle):
+	return read_bundle(Bundle, 'CFBundleIdentifier')[1]
+
+# Crawl folders for bundles, returning an index of CFBundleIdentifier to bundle paths
+def crawl(roots=None, workers=Workers, one_filesystem=False, prune=Prune, depth=MaxDepth):
+	Level = []
+	# Crawl a root reached by more than one pattern or symlink once, and none on network or backup volumes
+	for d in unique([d for r in roots or Roots for d in sorted(glob(r)) if volumes.searchable(d)]):
+		try:
+			Level.append((d, lstat(d).st_dev if one_filesystem else None))
+		except OSError:
+			pass
+	Bundles = []
+	pool = ThreadPool(workers)
+	try:
+		for i in range(depth + 1):
+			if (len(Level) == 0): break
+			Scanned = pool.map(lambda a: scan(a[0], a[1], prune), Level)
+			Next = []
+			for (d, device), (Folders, Found) in zip(Level, Scanned):
+				Bundles.extend(Found)
+				Next.extend((f, device) for f in Folders)
+			Level = Next
+		ids = pool.map(read_identifier, Bundles)
+	finally:
+		pool.close()
+	r = {}
+	for Bundle, id in sorted(zip(Bundles, ids)):
+		if (id): r.setdefault(id, []).append(Bundle)
+	return r
+
+# Index of the default roots, crawled once per run
+def index():
+	with lock:
+		if (not Crawled):
+			Index.update(crawl(Roots, Workers, OneFilesystem, Prune, MaxDepth))
+			Crawled.append(True)
+	return Index
@@ -0,0 +1,98 @@
+"""
+Keeps the result of each product with the inputs that produced it, so a delta run only re-evaluates the products whose inputs changed.
+A product's inputs are the paths its result was read from, each with its (st_dev, st_ino, st_mtime) signature: its bundles, their folders and Info.plists for bundle products, which also depend on the watched application folders (recorded once for them all); its pdb.db, plist, XML source or command otherwise.
+A product is evaluated again when any of its inputs' signatures or its definition changed, or it has no recorded result; every other result is served from the state, which costs a stat of each input and no subprocesses.
+Every product is evaluated again once the last full evaluation is older than Refresh seconds, which catches changes no input records (e.g. a copy installed in a new folder).
+Delta runs are enabled with CASPER_DELTA (or the runner's --delta flag).
+"""
+
+# Required modules
+from hashlib import sha1
+from json import dumps
+from os import environ
+from os.path import dirname
+from time import time
+from casper import Delta
+from casper.bundles import find_bundles, find_bundles_default, watched
+from casper.cache import bundle, signature
+from casper.files import read_json, write_json
+from casper.volumes import Policies
+
+# Whether runs only re-evaluate the products whose inputs changed
+Enabled = bool(environ.get('CASPER_DELTA'))
+# State file, or None to evaluate every product each run
+Path = Delta
+# Seconds between full evaluations of every product
+Refresh = 86400
+# Results given when a product couldn't be evaluated, which are never kept
+Failures = ('Error: Timed out', 'Error: Evaluating product', 'Error: Spotlight search failed')
+
+# Hash of a product definition
+def definition(p):
+	r = sha1(dumps(p, sort_keys=True).encode('utf-8')).hexdigest()
+	return r
+
+# Paths a product's result was read from, once it has been evaluated this run
+def inputs(p):
+	t = p.get('Template')
+	Volumes = p.get('Volumes', 'local')
+	r = []
+	if (t in ('BUNDLE', 'CUSTOM-JAMF') and 'CFBundleIdentifier' in p and Volumes in Policies):
+		for Bundle in find_bundles_default(p['CFBundleIdentifier'], p.get('Default'), Volumes):
+			r.extend([Bundle, dirname(Bundle), bundle(Bundle)['Plist']])
+	elif (t == 'CUSTOM-AdobeGamingSDK' and 'CFBundleIdentifier' in p and Volumes in Policies):
+		Folders = [dirname(Bundle) for Bundle in find_bundles(p['CFBundleIdentifier'], Volumes)]
+		for Folder in ([p['Default']] if p.get('Default') else []) + Folders:
+			r.extend([Folder, Folder + '/VersionInfo.txt'])
+	else:
+		r.append(p.get({'ADOBE_PDB': 'pdb', 'CMD': 'Command', 'PLIST': 'Plist', 'XML': 'Source'}.get(t)))
+	if (watches(p)): r.append(p.get('Default'))
+	r = sorted(set(f for f in r if f))
+	return r
+
+# Volumes policy whose watched folders a product's result also depends on, as a bundle installed in one changes it, or None
+def watches(p):
+	r = None
+	if (p.get('Template') in ('BUNDLE', 'CUSTOM-JAMF', 'CUSTOM-AdobeGamingSDK') and p.get('Volumes', 'local') in Policies):
+		r = p.get('Volumes', 'local')
+	return r
+
+# State of the previous delta runs, or a fresh one when it is missing or due a full evaluation
+def load():
+	s = read_json(Path) if Path else None
+	if (not isinstance(s, dict) or s.get('Version') != 1 or time() - s.get('Time', 0) > Refresh):
+		s = {'Version': 1, 'Time': time(), 'Products': {}, 'Watched': {}}
+	return s
+
+# Products to evaluate: those without a kept result, or whose definition or inputs changed
+def stale(Products, s):
+	Signatures = {}
+	# Signature of a path, read once however many products share it
+	def sig(f):
+		if (not f in Signatures): Signatures[f] = signature(f)
+		return Signatures[f]
+	# The watched folders are recorded once for every product watching them
+	Changed = set(policy for policy, Spine in s['Watched'].items() if any(sig(f) != v for f, v in Spine))
+	r = []
+	for p in Products:
+		e = s['Products'].get(p['Name'])
+		if (not e or e['Definition'] != definition(p) or any(sig(f) != v for f, v in e['Inputs'])):
+			r.append(p)
+		elif (watches(p) and (watches(p) in Changed or not watches(p) in s['Watched'])):
+			r.append(p)
+	return r
+
+# Keep the results of evaluated products, with their inputs, and write the state
+def record(s, Products, Results):
+	for p in Products:
+		if (Results[p['Name']] in Failures):
+			s['Products'].pop(p['Name'], None)
+		else:
+			s['Products'][p['Name']] = {'Definition': definition(p), 'Result': Results[p['Name']], 'Inputs': [[f, signature(f)] for f in inputs(p)]}
+	for policy in sorted(set(watches(p) for p in Products if watches(p))):
+		s['Watched'][policy] = [[f, signature(f)] for f in watched(policy)]
+	if (Path):
+		try:
+			write_json(s, Path)
+		except (IOError, OSError):
+			pass
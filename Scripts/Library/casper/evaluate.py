@@ -0,0 +1,246 @@
+"""
+Evaluates product definitions against the installed software.
+Each evaluator follows the template of the same name in Scripts/EA - Templates and returns the result that template would output.
+A product definition is a dictionary of the template's header constants, plus the Name and Template of its Extension Attribute.
+Products reading the same source share its installed versions, which are read once per run (see families.py).
+"""
+
+# Required modules
+from os import access, X_OK
+from os.path import dirname, exists, isabs, isfile
+from casper.adobe import query_db_product, read_payloads
+from casper.cache import read_bundle, unique
+from casper.bundles import crawling, discover, find_bundles, find_bundles_default, spotlight_disabled, unsearched
+from casper.command import read_command
+from casper.families import compare_family, installed
+from casper.plists import read_plist
+from casper.timing import set_product, timed
+from casper.volumes import Policies
+from casper.versions import compare_versions, pad_tuple, rationalise_version, version_in_range
+from casper.xmltags import read_tags, read_xml
+
+# Raised with the template's error message when a product definition is invalid
+class Invalid(Exception):
+	pass
+
+# Read a required parameter from a product definition
+def required(p, k, e):
+	try:
+		v = p[k]
+	except KeyError:
+		raise Invalid(e)
+	return v
+
+# Pad the second tuple of a version, following JAMF's version convention
+def pad_jamf(v):
+	v = pad_tuple(v, 1, 2)
+	return v
+
+# Validate Version and Range
+@timed('validation')
+def validate_versions(p, pad=None):
+	Version = rationalise_version(required(p, 'Version', 'Error: No Version specified'))
+	if (Version == ''):
+		raise Invalid('Error: Version is invalid')
+	if (pad): Version = pad(Version)
+	Range = p.get('Range')
+	if (Range):
+		if (len(Range) != 2):
+			raise Invalid('Error: Range requires two values')
+		Range = [rationalise_version(Range[0]), rationalise_version(Range[1])]
+		if (Range[0] == ''):
+			raise Invalid('Error: Range minimum is invalid')
+		if (Range[1] == ''):
+			raise Invalid('Error: Range maximum is invalid')
+		if (pad): Range = [pad(Range[0]), pad(Range[1])]
+		if (compare_versions(Range[0], Range[1]) != 'Older'):
+			raise Invalid('Error: Range minimum is greater than maximum')
+		if (version_in_range(Version, Range) == False):
+			raise Invalid('Error: Version is not within Range')
+	return Version, Range
+
+# Validate Default
+@timed('validation')
+def validate_default(p):
+	Default = p.get('Default')
+	if (Default):
+		if (not isabs(Default)):
+			raise Invalid('Error: Default path is invalid')
+	return Default
+
+# Validate Volumes, the volumes searched for bundles
+@timed('validation')
+def validate_volumes(p):
+	Volumes = p.get('Volumes', 'local')
+	if (not Volumes in Policies):
+		raise Invalid('Error: Volumes is invalid')
+	return Volumes
+
+# Result when no bundles are found, avoiding a false result when Spotlight is disabled and not crawled instead
+def not_found():
+	if (not crawling() and spotlight_disabled()):
+		r = 'Error: Spotlight is disabled'
+	else:
+		r = 'N/A'
+	return r
+
+# Evaluate a product with the BUNDLE template
+def evaluate_bundle(p, pad=None):
+	CFBundleIdentifier = required(p, 'CFBundleIdentifier', 'Error: CFBundleIdentifier not defined')
+	Key = required(p, 'Key', 'Error: No Key specified')
+	Version, Range = validate_versions(p, pad)
+	Default = validate_default(p)
+	Volumes = validate_volumes(p)
+	Installed = installed((p['Template'], CFBundleIdentifier, Key, Default, Volumes), lambda: read_bundles(CFBundleIdentifier, Key, Default, Volumes), pad)
+	return compare_family(Installed, Version, Range)
+
+# Read the installed versions of the bundles with CFBundleIdentifier
+def read_bundles(CFBundleIdentifier, Key, Default, Volumes):
+	Bundles = find_bundles_default(CFBundleIdentifier, Default, Volumes)
+	# Without the search's results, the bundles found may not be all of them
+	if (unsearched(CFBundleIdentifier, Volumes)):
+		return 'Error: Spotlight search failed'
+	if (len(Bundles) == 0):
+		return not_found()
+	# Check default location(s) for plist in bundle(s), through the bundle index
+	Installed = []
+	for Bundle in Bundles:
+		Plist, v = read_bundle(Bundle, Key)
+		if (Plist): Installed.append(v)
+	if (len(Installed) == 0):
+		return 'Error: Info.plist not in bundle(s)'
+	return Installed
+
+# Evaluate a product with the CUSTOM-JAMF template
+def evaluate_jamf(p):
+	return evaluate_bundle(p, pad_jamf)
+
+# Evaluate a product with the CUSTOM-AdobeGamingSDK template
+def evaluate_gaming_sdk(p):
+	CFBundleIdentifier = required(p, 'CFBundleIdentifier', 'Error: CFBundleIdentifier not defined')
+	Version, Range = validate_versions(p)
+	Default = validate_default(p)
+	Volumes = validate_volumes(p)
+	Installed = installed((p['Template'], CFBundleIdentifier, Default, Volumes), lambda: read_gaming_sdks(CFBundleIdentifier, Default, Volumes))
+	return compare_family(Installed, Version, Range)
+
+# Read the installed versions of the Adobe Gaming SDK folders holding bundles with CFBundleIdentifier
+def read_gaming_sdks(CFBundleIdentifier, Default, Volumes):
+	# Test Default path, add folder to array if it exists
+	Folders = []
+	if (Default):
+		if (exists(Default)): Folders.append(Default)
+	# Search for bundles and add parent folder to array, keeping one path to each folder
+	Folders = unique(Folders + [dirname(Bundle) for Bundle in find_bundles(CFBundleIdentifier, Volumes)])
+	if (unsearched(CFBundleIdentifier, Volumes)):
+		return 'Error: Spotlight search failed'
+	if (len(Folders) == 0):
+		return not_found()
+	# Check default location for VersionInfo file in folder(s)
+	VersionInfo = [Folder + '/VersionInfo.txt' for Folder in Folders if isfile(Folder + '/VersionInfo.txt')]
+	if (len(VersionInfo) == 0):
+		return 'Error: VersionInfo.txt not in folder(s)'
+	return [read_versioninfo(File) for File in VersionInfo]
+
+# Read Version from VersionInfo text file
+def read_versioninfo(f):
+	try:
+		v = open(f).read().splitlines()[0]
+	except:
+		v = ''
+	return v
+
+# Evaluate a product with the PLIST template
+def evaluate_plist(p):
+	Plist = required(p, 'Plist', 'Error: Plist path not defined')
+	Key = required(p, 'Key', 'Error: No Key specified')
+	required(p, 'Version', 'Error: No Version specified')
+	if (not isabs(Plist)):
+		raise Invalid('Error: Plist path is invalid')
+	Version, Range = validate_versions(p)
+	Installed = installed((p['Template'], Plist, Key), lambda: [read_plist(Plist, Key)] if isfile(Plist) else 'N/A')
+	return compare_family(Installed, Version, Range)
+
+# Evaluate a product with the XML template
+def evaluate_xml(p):
+	Source = required(p, 'Source', 'Error: Source path not defined')
+	Tag = required(p, 'Tag', 'Error: No Tag specified')
+	required(p, 'Version', 'Error: No Version specified')
+	if (not isabs(Source)):
+		raise Invalid('Error: Source path is invalid')
+	Version, Range = validate_versions(p)
+	Installed = installed((p['Template'], Source, Tag), lambda: [read_xml(Source, Tag)] if isfile(Source) else 'N/A')
+	return compare_family(Installed, Version, Range)
+
+# Evaluate a product with the CMD template
+def evaluate_command(p):
+	Command = required(p, 'Command', 'Error: Command not defined')
+	Arguments = p.get('Arguments', [])
+	Version, Range = validate_versions(p)
+	Timeout = p.get('Timeout')
+	# Run the executable directly, passing Arguments to it, rather than through a shell
+	Installed = installed((p['Template'], Command, tuple(Arguments), Timeout), lambda: [read_command(Command, Arguments, Timeout)] if access(Command, X_OK) else 'N/A')
+	return compare_family(Installed, Version, Range)
+
+# Evaluate a product with the ADOBE_PDB template
+def evaluate_pdb(p):
+	productName = required(p, 'productName', 'Error: productName not defined')
+	payloadName = p.get('payloadName')
+	Version, Range = validate_versions(p)
+	pdb = required(p, 'pdb', 'Error: pdb not defined')
+	Installed = installed((p['Template'], pdb, productName, payloadName), lambda: read_records(pdb, productName, payloadName))
+	return compare_family(Installed, Version, Range)
+
+# Read the installed versions of an Adobe product from its records in a pdb.db database
+def read_records(pdb, productName, payloadName):
+	if (not isfile(pdb)):
+		return 'N/A'
+	Records = query_db_product(pdb, productName, payloadName)
+	if (len(Records) == 0):
+		return 'N/A'
+	return Records
+
+# Evaluators, keyed by template name
+Templates = {
+	'ADOBE_PDB': evaluate_pdb,
+	'BUNDLE': evaluate_bundle,
+	'CMD': evaluate_command,
+	'CUSTOM-AdobeGamingSDK': evaluate_gaming_sdk,
+	'CUSTOM-JAMF': evaluate_jamf,
+	'PLIST': evaluate_plist,
+	'XML': evaluate_xml,
+}
+
+# Find the bundles of every product that searches by CFBundleIdentifier with one Spotlight query for each Volumes policy in use
+def discover_bundles(Products):
+	ids = {}
+	for p in Products:
+		if ('CFBundleIdentifier' in p and p.get('Volumes', 'local') in Policies): ids.setdefault(p.get('Volumes', 'local'), []).append(p['CFBundleIdentifier'])
+	for policy in sorted(ids):
+		discover(ids[policy], policy)
+
+# Read the tags of every product that uses the XML template with one pass over each Source
+def read_sources(Products):
+	Sources = {}
+	for p in Products:
+		if (p.get('Template') == 'XML' and 'Source' in p and 'Tag' in p):
+			Sources.setdefault(p['Source'], []).append(p['Tag'])
+	for Source in sorted(Sources):
+		if (isfile(Source)): read_tags(Source, Sources[Source])
+
+# Read the payloads of every database used by a product with the ADOBE_PDB template
+def read_databases(Products):
+	for pdb in sorted(set(p['pdb'] for p in Products if p.get('Template') == 'ADOBE_PDB' and 'pdb' in p)):
+		if (isfile(pdb)): read_payloads(pdb)
+
+# Evaluate a product definition, returning its result
+@timed('evaluate')
+def evaluate(p):
+	set_product(p.get('Name'))
+	if (not p.get('Template') in Templates):
+		return 'Error: Unknown template'
+	try:
+		r = Templates[p['Template']](p)
+	except Invalid as e:
+		r = str(e)
+	return r
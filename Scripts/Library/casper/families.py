@@ -0,0 +1,66 @@
+"""
+Evaluates products in families: products that read their installed versions from the same source and differ only by Version and Range, such as Parallels Desktop 10 and 11 or the Adobe pdb CC series.
+A family's installed versions are read once per run, rationalised and kept sorted by their parsed keys, so each member finds the versions within its Range by bisection rather than repeating the discovery and read and testing every version.
+A member's result is the one the templates give by comparing each installed version in turn and prioritising the results.
+"""
+
+# Required modules
+from bisect import bisect_left
+from threading import Lock
+from casper.timing import timed
+from casper.versions import parse_version, rationalise_version
+
+# Installed versions of each family read this run, keyed by source: the sorted keys of the versions, or the result when none could be read
+Installed = {}
+# Lock of each family, so members evaluated concurrently wait for one read rather than repeating it
+Locks = {}
+
+# Installed versions of a family, read the first time by reader, which returns a list of versions or a result
+def installed(k, reader, pad=None):
+	try:
+		r = Installed[k]
+	except KeyError:
+		with Locks.setdefault(k, Lock()):
+			if (not k in Installed): Installed[k] = sort_installed(reader(), pad)
+		r = Installed[k]
+	return r
+
+# Rationalise, pad and sort the installed versions read for a family
+@timed('sort_installed')
+def sort_installed(Read, pad=None):
+	if (not isinstance(Read, list)):
+		return Read
+	# Unreadable versions are left out, as they only decide the result when no version could be compared
+	Keys = []
+	for v in Read:
+		v = rationalise_version(v)
+		if (v != ''):
+			if (pad): v = pad(v)
+			Keys.append(parse_version(v))
+	Keys.sort()
+	return Keys
+
+# Compare a family's installed versions with a member's Version and Range, prioritising the results as the templates do
+# Timed as the result prioritisation phase, which it replaces the templates' comparison of each installed version for
+@timed('prioritise_results')
+def compare_family(Keys, Version, Range):
+	if (not isinstance(Keys, list)):
+		return Keys
+	# Versions within Range (minimum inclusive, maximum exclusive) are a slice of the sorted keys
+	a, b = 0, len(Keys)
+	if (Range):
+		a = bisect_left(Keys, parse_version(Range[0]))
+		b = bisect_left(Keys, parse_version(Range[1]), a)
+	v = parse_version(Version)
+	e = bisect_left(Keys, v, a, b)
+	if (a < b and Keys[b - 1] > v):
+		r = 'Newer'
+	elif (e < b and Keys[e] == v):
+		r = 'Equal'
+	elif (a < b):
+		r = 'Older'
+	elif (len(Keys) > 0):
+		r = 'N/A'
+	else:
+		r = 'Error: Reading installed version'
+	return r
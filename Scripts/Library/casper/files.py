@@ -0,0 +1,29 @@
+"""
+Reads and writes the JSON files the runtime keeps between runs.
+Files are replaced atomically with rename, so a reader never sees a partial file, even while another run is writing it.
+"""
+
+# Required modules
+from json import dump, load
+from os import fdopen, makedirs, rename
+from os.path import basename, dirname, isdir
+
+# Write JSON to a file atomically
+def write_json(d, f):
+	# Imported here, so reading JSON never imports tempfile
+	from tempfile import mkstemp
+	if (not isdir(dirname(f))):
+		makedirs(dirname(f))
+	fd, t = mkstemp(dir=dirname(f), prefix='.' + basename(f))
+	with fdopen(fd, 'w') as o:
+		dump(d, o, sort_keys=True, indent=0, separators=(',', ':'))
+	rename(t, f)
+
+# Read JSON from a file, returning None if it is missing or unreadable
+def read_json(f):
+	try:
+		with open(f) as i:
+			d = load(i)
+	except (IOError, OSError, ValueError):
+		d = None
+	return d
@@ -0,0 +1,39 @@
+"""
+Packs the results of many products into one string, so a single Extension Attribute can report every product instead of one attribute each.
+The packed form is |key=Result|key=Result|..., sorted by key. A product's key is its name in lowercase letters and digits, without the 'Version ' prefix, and every error is packed as Error.
+A smart group matches one product's result with the like operator on |key=Result|, which can't match part of another product's entry.
+Products may also be packed by category, the folder of their scripts (e.g. Bundle for EA - Bundle), for a few smaller attributes.
+"""
+
+# Required modules
+from re import sub
+from casper.products import Folders
+
+# Key of a product in the packed form
+def key(Name):
+	if (Name.startswith('Version ')): Name = Name[len('Version '):]
+	r = sub('[^a-z0-9]', '', Name.lower())
+	return r
+
+# A result as it is packed, with every error reported as Error
+def code(r):
+	if (r.startswith('Error')):
+		r = 'Error'
+	return r
+
+# Category of a product: the folder of its script, without 'EA - '
+def category(p):
+	t = p['Template'].split('-')[0]
+	r = [f for f in sorted(Folders) if Folders[f] == t][0][len('EA - '):]
+	return r
+
+# Pack the results of products, or of the products in a category
+def pack(Results, Products, Category=None):
+	Entries = sorted((key(p['Name']), code(Results.get(p['Name'], 'Error: Product not in inventory'))) for p in Products if Category is None or category(p) == Category)
+	r = '|' + ''.join(k + '=' + v + '|' for k, v in Entries)
+	return r
+
+# Criterion value matching a product's result in the packed form
+def criterion(Name, Result):
+	r = '|' + key(Name) + '=' + code(Result) + '|'
+	return r
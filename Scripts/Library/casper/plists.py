@@ -0,0 +1,216 @@
+"""
+Reads keys from property lists for the BUNDLE, PLIST and CUSTOM-JAMF templates.
+XML and binary property lists are read in-process, matching the output of '/usr/bin/defaults read' for a top-level key.
+Only the requested key is decoded: binary plists are memory-mapped and only the top-level keys and the requested value are read from the object table, and XML plists are scanned as a stream that stops at the requested value.
+Property lists that can't be parsed in-process (e.g. old-style ASCII plists) are read with defaults instead.
+Values are memoised, so a plist shared by several products is only read once per run.
+"""
+
+# Required modules
+from datetime import datetime, timedelta
+from mmap import ACCESS_READ, mmap
+from numbers import Number
+from struct import unpack
+from xml.etree.ElementTree import iterparse
+from casper.command import execute_command
+from casper.timing import timed
+try:
+	from plistlib import loads as _loads
+except ImportError:
+	from plistlib import readPlistFromString as _loads
+
+try:
+	Text = basestring
+except NameError:
+	Text = str
+
+# Command used for plists that can't be parsed in-process
+DefaultsTool = '/usr/bin/defaults'
+# Values read, keyed by plist path and key
+Values = {}
+# Start of the Core Foundation absolute time used by binary plist dates
+Epoch = datetime(2001, 1, 1)
+# Readers for XML plist values, keyed by tag
+XMLValues = {
+	'string': lambda t: t,
+	'integer': lambda t: str(int(t)),
+	'real': lambda t: str(float(t)),
+	'true': lambda t: '1',
+	'false': lambda t: '0',
+}
+
+# Raised when a property list can't be parsed in-process
+class Unreadable(Exception):
+	pass
+
+# Read a big-endian unsigned integer of any size
+def read_uint(b, o, n):
+	v = 0
+	for c in bytearray(b[o:o + n]):
+		v = (v << 8) | c
+	return v
+
+# Read a binary plist's trailer, returning offset size, reference size, top object and offset table position
+def read_trailer(b):
+	if (b[:8] != b'bplist00' or len(b) < 40):
+		raise Unreadable('not a binary plist')
+	t = bytearray(b[-32:])
+	return t[6], t[7], read_uint(b, len(b) - 16, 8), read_uint(b, len(b) - 8, 8)
+
+# Read the marker and length of the object at an offset, returning them with the offset of its contents
+def read_marker(b, o):
+	m = bytearray(b[o:o + 1])[0]
+	n = m & 0x0F
+	o += 1
+	if (n == 0x0F and m >> 4 not in (0x0, 0x1, 0x2, 0x3)):
+		i = bytearray(b[o:o + 1])[0]
+		if (i >> 4 != 0x1):
+			raise Unreadable('invalid object length')
+		s = 1 << (i & 0x0F)
+		n = read_uint(b, o + 1, s)
+		o += 1 + s
+	return m, n, o
+
+# Read an object from a binary plist, following references through the offset table
+def read_object(b, r, t, Offsets, depth=0):
+	if (depth > 64):
+		raise Unreadable('object graph too deep')
+	o = Offsets(r)
+	m, n, o = read_marker(b, o)
+	k = m >> 4
+	if (m == 0x08):
+		v = False
+	elif (m == 0x09):
+		v = True
+	elif (k == 0x0):
+		v = None
+	elif (k == 0x1):
+		s = 1 << n
+		v = read_uint(b, o, s)
+		if (s == 8 and v >= 1 << 63): v -= 1 << 64
+	elif (k == 0x2):
+		v = unpack('>f' if n == 2 else '>d', b[o:o + (1 << n)])[0]
+	elif (m == 0x33):
+		v = Epoch + timedelta(seconds=unpack('>d', b[o:o + 8])[0])
+	elif (k == 0x4):
+		v = bytearray(b[o:o + n])
+	elif (k == 0x5):
+		v = b[o:o + n].decode('ascii')
+	elif (k == 0x6):
+		v = b[o:o + 2 * n].decode('utf-16-be')
+	elif (k == 0x8):
+		v = read_uint(b, o, n + 1)
+	elif (k in (0xA, 0xC)):
+		v = [read_object(b, read_uint(b, o + i * t, t), t, Offsets, depth + 1) for i in range(n)]
+	elif (k == 0xD):
+		v = {}
+		for i in range(n):
+			a = read_object(b, read_uint(b, o + i * t, t), t, Offsets, depth + 1)
+			v[a] = read_object(b, read_uint(b, o + (n + i) * t, t), t, Offsets, depth + 1)
+	else:
+		raise Unreadable('unknown object type')
+	return v
+
+# Parse a binary plist
+def parse_binary(b):
+	s, t, top, table = read_trailer(b)
+	Offsets = lambda r: read_uint(b, table + r * s, s)
+	v = read_object(b, top, t, Offsets)
+	return v
+
+# Parse an XML or binary plist
+def parse_plist(b):
+	if (b[:8] == b'bplist00'):
+		v = parse_binary(b)
+	else:
+		try:
+			v = _loads(b)
+		except Exception:
+			raise Unreadable('not an XML plist')
+	return v
+
+# Look up a top-level key in a binary plist, decoding only the top-level keys and the requested value
+def lookup_binary(b, k):
+	s, t, top, table = read_trailer(b)
+	Offsets = lambda r: read_uint(b, table + r * s, s)
+	m, n, o = read_marker(b, Offsets(top))
+	if (m >> 4 != 0xD):
+		raise Unreadable('top-level object is not a dictionary')
+	for i in range(n):
+		if (read_object(b, read_uint(b, o + i * t, t), t, Offsets) == k):
+			return read_object(b, read_uint(b, o + (n + i) * t, t), t, Offsets)
+	raise KeyError(k)
+
+# Look up a top-level key in an XML plist, scanning the file until the requested value ends
+def lookup_xml(f, k):
+	Open = []
+	found = False
+	try:
+		for event, e in iterparse(f, events=('start', 'end')):
+			if (event == 'start'):
+				Open.append(e)
+				continue
+			Open.pop()
+			# Children of the top-level dictionary hold the keys and values
+			if (len(Open) == 2 and Open[1].tag == 'dict'):
+				if (found):
+					try:
+						return XMLValues[e.tag](e.text or '')
+					except (KeyError, ValueError):
+						return ''
+				found = (e.tag == 'key' and e.text == k)
+			# Discard each element once it ends, so memory is bounded by the nesting depth
+			if (Open): Open[-1].remove(e)
+	except SyntaxError:
+		raise Unreadable('not an XML plist')
+	return ''
+
+# Format a value as defaults would print it
+def format_value(v):
+	if (v is True or v is False):
+		v = str(int(v))
+	elif (isinstance(v, Text)):
+		pass
+	elif (isinstance(v, Number)):
+		v = str(v)
+	else:
+		v = ''
+	return v
+
+# Read Key's Value as String from Plist in-process
+def read_plist_native(p, k):
+	try:
+		f = open(p, 'rb')
+	except (IOError, OSError):
+		return ''
+	with f:
+		if (f.read(8) == b'bplist00'):
+			m = mmap(f.fileno(), 0, access=ACCESS_READ)
+			try:
+				v = format_value(lookup_binary(m, k))
+			except KeyError:
+				v = ''
+			finally:
+				m.close()
+		else:
+			f.seek(0)
+			v = lookup_xml(f, k)
+	return v
+
+# Read Key's Value as String from Plist with defaults
+def read_plist_defaults(p, k):
+	v = execute_command([DefaultsTool, 'read', p, k])
+	return v
+
+# Read Key's Value as String from Plist
+@timed('read_plist')
+def read_plist(p, k):
+	try:
+		v = Values[(p, k)]
+	except KeyError:
+		try:
+			v = read_plist_native(p, k)
+		except Exception:
+			v = read_plist_defaults(p, k)
+		Values[(p, k)] = v
+	return v
@@ -0,0 +1,107 @@
+"""
+Loads product definitions from the product manifest.
+The manifest is built from the header constants of the Extension Attribute scripts, which are read as literals rather than executed.
+Values matching a template's defaults are left out of the manifest and restored when it is loaded.
+The scripts pass their header constants to the runtime too, so a script edited in the JSS is evaluated as it is rather than as the manifest has it.
+"""
+
+# Required modules
+from ast import Assign, Name, literal_eval, parse
+from json import dumps, load as load_json
+from os.path import basename, dirname, join
+
+# Template used by the scripts in each folder
+Folders = {
+	'EA - Adobe pdb': 'ADOBE_PDB',
+	'EA - Bundle': 'BUNDLE',
+	'EA - Command': 'CMD',
+	'EA - Custom': 'CUSTOM',
+	'EA - Plist': 'PLIST',
+	'EA - Xml': 'XML',
+}
+
+# Start and end of the header of a script, which sits between the docstring and the required modules
+def header_span(s):
+	r = (s.find('"""', s.find('"""') + 3) + 3, s.find('# Required modules'))
+	return r
+
+# Read the header constants of a script
+def read_header(f):
+	s = open(f).read()
+	a, b = header_span(s)
+	s = s[a:b]
+	h = {}
+	for a in parse(s).body:
+		if (isinstance(a, Assign) and len(a.targets) == 1 and isinstance(a.targets[0], Name)):
+			h[a.targets[0].id] = literal_eval(a.value)
+	return h
+
+# Template of a script in a folder
+def template(folder, h):
+	t = Folders.get(folder)
+	# Custom scripts read either an Info.plist Key or a VersionInfo.txt file
+	if (t == 'CUSTOM'):
+		if ('Key' in h):
+			t = 'CUSTOM-JAMF'
+		else:
+			t = 'CUSTOM-AdobeGamingSDK'
+	return t
+
+# Header constants shared by most products of a template
+Defaults = {
+	'ADOBE_PDB': {'pdb': '/Library/Application Support/Adobe/caps/pdb.db'},
+	'BUNDLE': {'Key': 'CFBundleShortVersionString'},
+	'CUSTOM-JAMF': {'Key': 'CFBundleShortVersionString'},
+}
+
+# Read product definitions from the Extension Attribute scripts under a folder
+def read_scripts(root):
+	# Imported here, as only the tools read the scripts
+	from glob import glob
+	Products = []
+	for f in sorted(glob(join(root, 'EA - *', '*.py'))):
+		folder = basename(dirname(f))
+		if (not folder in Folders): continue
+		p = read_header(f)
+		p['Name'] = basename(f)[:-3]
+		p['Template'] = template(folder, p)
+		Products.append(p)
+	return Products
+
+# Product defined by a script's header constants, given the template of a product in the same folder
+def header_product(Name, h, t):
+	folder = [f for f in sorted(Folders) if Folders[f] == t.split('-')[0]][0]
+	p = dict(Defaults.get(template(folder, h), {}))
+	p.update(h)
+	p['Name'] = Name
+	p['Template'] = template(folder, h)
+	return p
+
+# Load product definitions from a manifest
+def load(f):
+	with open(f) as i:
+		m = load_json(i)
+	Products = []
+	for n in sorted(m['Products']):
+		p = dict(m['Defaults'].get(m['Products'][n]['Template'], {}))
+		p.update(m['Products'][n])
+		p['Name'] = n
+		Products.append(p)
+	return Products
+
+# Write product definitions to a manifest, one product per line
+def write_manifest(Products, f):
+	Lines = []
+	for p in sorted(Products, key=lambda a: a['Name']):
+		d = Defaults.get(p['Template'], {})
+		h = dict((k, v) for k, v in p.items() if k != 'Name' and not (k in d and d[k] == v))
+		Lines.append(dumps(p['Name']) + ': ' + dumps(h, sort_keys=True))
+	with open(f, 'w') as o:
+		o.write('{"Defaults": ' + dumps(Defaults, sort_keys=True) + ',\n"Products": {\n' + ',\n'.join(Lines) + '\n}}\n')
+
+# Select products by name or template, keeping every product when neither is given
+def select(Products, names=None, templates=None):
+	if (not names and not templates):
+		return Products
+	r = [p for p in Products if p['Name'] in (names or []) or p['Template'] in (templates or [])]
+	return r
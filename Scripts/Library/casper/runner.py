@@ -0,0 +1,130 @@
+"""
+Evaluates every product in the manifest in one interpreter and writes all results in one pass.
+Extension Attribute scripts read their result with result(), which runs the evaluation itself when the results are missing or stale.
+A script whose header constants differ from its product in the manifest, as when it was edited in the JSS, or whose product isn't in the manifest yet, is evaluated on its own from them.
+In delta mode only the products whose inputs changed since the last delta run are evaluated, and the other results are served from its state (see casper.delta).
+A packed Extension Attribute reads the results of every product, or of a category of products, in one string with packed().
+Any subset of the products may also be evaluated in a batch by name or template.
+The sources shared by many products are read first, then every product is evaluated, each step running concurrently (see casper.scheduler).
+Reading fresh results only needs json and os, so the evaluation's modules are imported when a run starts rather than by every Extension Attribute.
+"""
+
+# Required modules
+from json import dumps
+from os.path import getmtime
+from time import time
+from casper import Manifest, Results
+from casper.files import read_json, write_json
+from casper.products import header_product, load, select
+
+# Seconds results are served for before they are evaluated again
+MaxAge = 300
+
+# Evaluate products, returning their results keyed by name
+def run(Products, workers=None, timeout=None):
+	# Imported here, so attributes reading fresh results never import the evaluation
+	from casper import cache, scheduler, timing
+	from casper.evaluate import discover_bundles, evaluate, read_databases, read_sources
+	# Readers of the sources shared by many products: bundles found with Spotlight or the crawler, XML sources and pdb.db
+	Sources = [discover_bundles, read_sources, read_databases]
+	r = {}
+	scheduler.schedule([(f, (Products,)) for f in Sources], workers, timeout)
+	for p, v in zip(Products, scheduler.schedule([(evaluate, (p,)) for p in Products], workers, timeout)):
+		if (isinstance(v, scheduler.TimedOut)):
+			r[p['Name']] = 'Error: Timed out'
+		elif (isinstance(v, Exception)):
+			r[p['Name']] = 'Error: Evaluating product'
+		else:
+			r[p['Name']] = v
+	cache.save()
+	timing.write()
+	return r
+
+# Evaluate the products whose inputs changed since a previous delta run, serving the others' results from its state
+def run_delta(Products, workers=None, timeout=None):
+	from casper import delta
+	s = delta.load()
+	Stale = delta.stale(Products, s)
+	if (len(Stale) == 0):
+		return dict((p['Name'], s['Products'][p['Name']]['Result']) for p in Products)
+	r = run(Stale, workers, timeout)
+	delta.record(s, Stale, r)
+	r.update((p['Name'], s['Products'][p['Name']]['Result']) for p in Products if not p['Name'] in r)
+	return r
+
+# Write results atomically, so readers never see a partial file
+def write_results(r, f):
+	write_json(r, f)
+
+# Read results, unless they are older than age seconds
+def read_results(f, age):
+	try:
+		if (time() - getmtime(f) > age):
+			return None
+	except OSError:
+		return None
+	r = read_json(f)
+	return r
+
+# Results of every product, evaluating every product if the results are missing or stale
+def results(f=Results, age=MaxAge, manifest=Manifest):
+	r = read_results(f, age)
+	if (r is None):
+		from casper import delta
+		r = (run_delta if delta.Enabled else run)(load(manifest))
+		try:
+			write_results(r, f)
+		except (IOError, OSError):
+			pass
+	return r
+
+# Result for a product, evaluated from the header constants and template of its script when given and they differ from the manifest, or it isn't in the manifest
+def result(name, f=Results, age=MaxAge, manifest=Manifest, header=None, template=None):
+	if (header is not None):
+		Products = [p for p in load(manifest) if p['Name'] == name]
+		t = Products[0]['Template'] if Products else template
+		if (t and (not Products or header_product(name, header, t) != Products[0])):
+			return run([header_product(name, header, t)])[name]
+	return results(f, age, manifest).get(name, 'Error: Product not in inventory')
+
+# Results of every product, or of the products in a category, packed into one string (see casper.packed)
+def packed(Category=None, f=Results, age=MaxAge, manifest=Manifest):
+	from casper.packed import pack
+	return pack(results(f, age, manifest), load(manifest), Category)
+
+# Evaluate every product and write the results, or print the results for a subset of products
+def main(argv=None):
+	from argparse import ArgumentParser
+	from casper import bundles, delta, scheduler, timing
+	from casper.packed import pack
+	parser = ArgumentParser(description='Evaluates Extension Attribute products and writes the results.')
+	parser.add_argument('--manifest', default=Manifest, help='product manifest to evaluate')
+	parser.add_argument('--output', default=Results, help='results file to write')
+	parser.add_argument('--name', action='append', help='evaluate and print the result of a product (repeatable)')
+	parser.add_argument('--template', action='append', help='evaluate and print the results of a template\'s products (repeatable)')
+	parser.add_argument('--packed', action='store_true', help='print the packed results of every product, as the packed Extension Attribute reports them')
+	parser.add_argument('--category', help='with --packed, print the packed results of a category of products only (e.g. Bundle)')
+	parser.add_argument('--delta', action='store_true', default=delta.Enabled, help='only evaluate the products whose inputs changed since the last delta run (or set CASPER_DELTA)')
+	parser.add_argument('--refresh', type=int, default=delta.Refresh, help='with --delta, seconds between evaluations of every product')
+	parser.add_argument('--backend', choices=['auto', 'spotlight', 'crawler'], default=bundles.Backend, help='how bundles are found (auto crawls when Spotlight is disabled)')
+	parser.add_argument('--workers', type=int, default=scheduler.Workers, help='products evaluated concurrently (1 evaluates them one at a time)')
+	parser.add_argument('--timing', default=timing.Output, help='file to write the time of each phase to (or set CASPER_TIMING)')
+	parser.add_argument('--timing-format', choices=['jsonl', 'chrome'], default=timing.Format, help='JSON lines appended per run, or a Chrome trace-event file')
+	args = parser.parse_args(argv)
+	bundles.Backend = args.backend
+	scheduler.Workers = args.workers
+	timing.Output = args.timing
+	timing.Format = args.timing_format
+	delta.Enabled = args.delta
+	delta.Refresh = args.refresh
+	evaluator = run_delta if delta.Enabled else run
+	Products = load(args.manifest)
+	if (args.packed):
+		print(pack(evaluator(Products), Products, args.category))
+	elif (args.name or args.template):
+		print(dumps(run(select(Products, args.name, args.template)), sort_keys=True, indent=1))
+	else:
+		write_results(evaluator(Products), args.output)
+
+if __name__ == '__main__':
+	main()
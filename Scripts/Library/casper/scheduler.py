@@ -0,0 +1,71 @@
+"""
+Runs the probes of a run concurrently on a bounded number of worker threads.
+Probes mostly wait, on subprocesses (mdfind, mdutil, defaults and the CMD template's commands) or on small file reads, so threads overlap them well despite the GIL.
+The Extension Attributes run under Python 2.7, which has no asyncio, so the scheduler uses plain daemon threads; a probe that never returns can't keep the interpreter from exiting.
+Results are returned in the order the probes were given, whatever order they finish in, and a probe running longer than the timeout is given up on.
+Once every worker is stuck on a probe past the timeout, the probes still queued are given up on too, as no worker is left to start them.
+"""
+
+# Required modules
+from threading import Event, Lock, Thread
+from time import time
+
+# Worker threads running probes
+Workers = 8
+# Seconds a probe may run before it is given up on
+Timeout = 120
+
+# Result of a probe that ran longer than the timeout
+class TimedOut(Exception):
+	pass
+
+# Run probes, given as (function, arguments) pairs, returning their results in order, or the exception each raised
+def schedule(probes, workers=None, timeout=None):
+	workers = workers or Workers
+	timeout = timeout or Timeout
+	n = len(probes)
+	Results = [None] * n
+	Started = [None] * n
+	Done = [Event() for i in range(n)]
+	Next = iter(range(n))
+	# Start time of the probe each worker is running
+	Running = {}
+	Stopped = []
+	lock = Lock()
+	def worker(w):
+		while (True):
+			with lock:
+				i = None if Stopped else next(Next, None)
+				if (i is None): return
+				Started[i] = Running[w] = time()
+			f, a = probes[i]
+			try:
+				Results[i] = f(*a)
+			except Exception as e:
+				Results[i] = e
+			with lock:
+				Running.pop(w)
+			Done[i].set()
+	k = max(1, min(workers, n))
+	for w in range(k):
+		t = Thread(target=worker, args=(w,))
+		t.daemon = True
+		t.start()
+	r = []
+	for i in range(n):
+		while (not Done[i].is_set()):
+			s = Started[i]
+			if (s is not None and time() - s >= timeout): break
+			if (s is None):
+				# Probes still queued haven't started their timeout yet, and never will while every worker is stuck
+				with lock:
+					Remaining = [timeout - (time() - v) for v in Running.values()]
+				if (len(Remaining) == k and max(Remaining) <= 0): break
+				Done[i].wait(max(Remaining) if len(Remaining) == k else 0.01)
+			else:
+				Done[i].wait(max(0, timeout - (time() - s)))
+		r.append(Results[i] if Done[i].is_set() else TimedOut())
+	# Workers stuck on probes given up on start no more once they return
+	with lock:
+		Stopped.append(True)
+	return r
@@ -0,0 +1,78 @@
+"""
+Times the phases of a run, for finding out why inventory is slow on a given Mac.
+Timing is enabled by setting CASPER_TIMING to a file (or with the runner's --timing flag), and never changes the results.
+Each phase of each product is recorded with its start and duration, and written when the run ends, either as JSON lines appended to the file or as a Chrome trace-event file (CASPER_TIMING_FORMAT=chrome), which chrome://tracing and Perfetto can open.
+Phases are timed by decorating the functions that implement them; while timing is disabled the decorator only adds one check per call.
+"""
+
+# Required modules
+from functools import wraps
+from json import dumps
+from os import environ, getpid
+from threading import current_thread, local
+from time import time
+from casper.files import write_json
+
+# File timings are written to, or None when timing is disabled
+Output = environ.get('CASPER_TIMING') or None
+# Format of the file: 'jsonl' to append JSON lines, or 'chrome' to write a trace-event file
+Format = environ.get('CASPER_TIMING_FORMAT', 'jsonl')
+# Phases recorded in this run
+Events = []
+# Product being evaluated by each thread
+Current = local()
+# Runs written by this process, so each run gets its own identifier
+Runs = []
+
+# Record the time spent in a function as a phase
+def timed(name):
+	def decorator(f):
+		@wraps(f)
+		def wrapper(*args, **kwargs):
+			if (not Output):
+				return f(*args, **kwargs)
+			t = time()
+			try:
+				return f(*args, **kwargs)
+			finally:
+				Events.append((name, getattr(Current, 'product', None), t, time() - t, current_thread().ident))
+		return wrapper
+	return decorator
+
+# Set the product the current thread is evaluating
+def set_product(name):
+	Current.product = name
+
+# Identifier of a new run, shared by its events
+def run_id():
+	r = '%d-%d-%d' % (time(), getpid(), len(Runs))
+	Runs.append(r)
+	return r
+
+# Phases recorded, as dictionaries
+def events(Run):
+	r = [{'run': Run, 'phase': n, 'product': p, 'start': t, 'seconds': d, 'thread': i} for n, p, t, d, i in Events]
+	return r
+
+# Phases recorded, as Chrome trace events
+def trace(Run):
+	r = [{
+		'name': n, 'cat': 'casper', 'ph': 'X', 'ts': int(t * 1e6), 'dur': int(d * 1e6),
+		'pid': getpid(), 'tid': i, 'args': {'product': p, 'run': Run},
+	} for n, p, t, d, i in Events]
+	return {'traceEvents': r, 'displayTimeUnit': 'ms'}
+
+# Write the phases recorded, if timing is enabled
+def write():
+	if (not Output or not Events):
+		return
+	Run = run_id()
+	try:
+		if (Format == 'chrome'):
+			write_json(trace(Run), Output)
+		else:
+			with open(Output, 'a') as o:
+				o.write(''.join(dumps(e, sort_keys=True) + '\n' for e in events(Run)))
+	except (IOError, OSError):
+		pass
+	del Events[:]
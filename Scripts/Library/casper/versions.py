@@ -0,0 +1,134 @@
+"""
+Version string helpers shared by every template.
+Versions are ordered as pkg_resources.parse_version orders them: PEP 440 versions by release numbers and pre, post and dev markers, and any other string by the legacy setuptools rules, before every PEP 440 version.
+Each version is parsed into a tuple key, so comparing two versions is one tuple comparison, without importing pkg_resources.
+Parsed keys are memoised, so each distinct version string is only parsed once per run.
+"""
+
+# Required modules
+from re import compile, sub, IGNORECASE, VERBOSE
+from casper.timing import timed
+
+# PEP 440 version, as matched by packaging.version
+Pep440 = compile(r"""
+	^\s*v?
+	(?:(?P<epoch>[0-9]+)!)?
+	(?P<release>[0-9]+(?:\.[0-9]+)*)
+	(?P<pre>[-_.]?(?P<pre_l>a|b|c|rc|alpha|beta|pre|preview)[-_.]?(?P<pre_n>[0-9]+)?)?
+	(?P<post>(?:-(?P<post_n1>[0-9]+))|(?:[-_.]?(?P<post_l>post|rev|r)[-_.]?(?P<post_n2>[0-9]+)?))?
+	(?P<dev>[-_.]?(?P<dev_l>dev)[-_.]?(?P<dev_n>[0-9]+)?)?
+	(?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?
+	\s*$
+""", IGNORECASE | VERBOSE)
+# Spellings of pre and post release markers
+Letters = {'alpha': 'a', 'beta': 'b', 'c': 'rc', 'pre': 'rc', 'preview': 'rc', 'rev': 'post', 'r': 'post'}
+# Components of a legacy version, and their replacements
+LegacyParts = compile(r'(\d+|[a-z]+|\.|-)')
+LegacyNames = {'pre': 'c', 'preview': 'c', '-': 'final-', 'rc': 'c', 'dev': '@'}
+
+# Parsed versions, keyed by version string
+Parsed = {}
+
+# Number of a pre, post or dev marker, which defaults to 0
+def marker_number(n):
+	r = int(n or 0)
+	return r
+
+# Key of a PEP 440 version, with the packaging.version infinities encoded as leading 0s (lowest) and 2s (highest)
+def pep440_key(m):
+	release = [int(a) for a in m.group('release').split('.')]
+	while (release and release[-1] == 0):
+		release.pop()
+	if (m.group('pre')):
+		l = m.group('pre_l').lower()
+		pre = (1, Letters.get(l, l), marker_number(m.group('pre_n')))
+	elif (m.group('dev') and not m.group('post')):
+		pre = (0,)
+	else:
+		pre = (2,)
+	if (m.group('post')):
+		post = (1, marker_number(m.group('post_n1') or m.group('post_n2')))
+	else:
+		post = (0,)
+	if (m.group('dev')):
+		dev = (0, marker_number(m.group('dev_n')))
+	else:
+		dev = (1,)
+	if (m.group('local')):
+		local = (1, tuple((1, int(a), '') if a.isdigit() else (0, 0, a.lower()) for a in sub('[-_.]', '.', m.group('local')).split('.')))
+	else:
+		local = (0,)
+	return (int(m.group('epoch') or 0), tuple(release), pre, post, dev, local)
+
+# Key of any other version, following the legacy setuptools rules, which sorts before every PEP 440 version
+def legacy_key(v):
+	parts = []
+	for a in LegacyParts.split(v.lower()) + ['*final']:
+		if (a == '*final'):
+			pass
+		else:
+			a = LegacyNames.get(a, a)
+			if (a == '' or a == '.'): continue
+			a = a.zfill(8) if a[:1].isdigit() else '*' + a
+		if (a.startswith('*')):
+			if (a < '*final'):
+				while (parts and parts[-1] == '*final-'):
+					parts.pop()
+			while (parts and parts[-1] == '00000000'):
+				parts.pop()
+		parts.append(a)
+	return (-1, tuple(parts))
+
+# Parse Version String into a key
+def parse_version(v):
+	try:
+		r = Parsed[v]
+	except KeyError:
+		m = Pep440.match(v)
+		r = Parsed[v] = pep440_key(m) if m else legacy_key(v)
+	return r
+
+# Rationalise Version String
+@timed('rationalise_version')
+def rationalise_version(v):
+	# Convert to lowercase
+	v = v.lower()
+	# Remove leading non-numeric characters
+	v = sub('^[^0-9]*', '', v)
+	# Remove trailing spaces
+	v = sub(' *$', '', v)
+	# Replace commas with periods
+	v = sub(',', '.', v)
+	# Remove 'dodgy' characters
+	v = sub('[^a-z0-9 .-]', '', v)
+	return v
+
+# Pad a tuple of the Version String with trailing '0's to a minimum length
+def pad_tuple(v, t, l):
+	a = v.split('.')
+	try:
+		a[t]
+	except:
+		a.append('0')
+	while (len(a[t]) < l):
+		a[t] = a[t] + '0'
+	v = '.'.join(a)
+	return v
+
+# Compare Version Strings
+@timed('compare_versions')
+def compare_versions(v1, v2):
+	v1 = parse_version(v1)
+	v2 = parse_version(v2)
+	if (v1 == v2):
+		r = 'Equal'
+	elif (v1 < v2):
+		r = 'Older'
+	else:
+		r = 'Newer'
+	return r
+
+# Version in Range
+def version_in_range(v, r):
+	r = parse_version(r[1]) > parse_version(v) >= parse_version(r[0])
+	return r
@@ -0,0 +1,88 @@
+"""
+Classifies the volumes bundles are found on, so discovery skips volumes that are slow to read, may be asleep, or hold stale copies of products.
+The mount table is read with mount once, and kept in the bundle index (see casper.cache) until a volume is mounted or unmounted in /Volumes.
+Each mount is 'local' (the boot volume and its system volumes), 'network' (without the local mount flag), 'backup' (a Time Machine destination or snapshot) or 'removable' (any other local volume: external disks, disk images and other internal disks).
+A path is classed by the longest mount point it is below, from its path alone, so a skipped volume is never touched.
+Products search local volumes only, unless their Volumes header includes removable ones; network and backup volumes are never searched.
+"""
+
+# Required modules
+from os.path import isdir, join
+from threading import Lock
+from casper import cache
+from casper.command import execute_command
+from casper.timing import timed
+
+# Mount table command
+Mount = '/sbin/mount'
+# Folder volumes are mounted in, which changes whenever a volume is mounted or unmounted
+Folder = '/Volumes'
+# Classes of volume searched under each Volumes policy
+Policies = {
+	'local': ('local',),
+	'removable': ('local', 'removable'),
+}
+# Classes of volume searched under any policy
+Searchable = set(c for Classes in Policies.values() for c in Classes)
+# Mount points and their classes, longest first, read once per run
+Mounts = []
+Read = []
+lock = Lock()
+
+# Parse a line of mount's output into its mount point and mount flags
+def parse_mount(l):
+	Device, s, Rest = l.partition(' on ')
+	Point, t, Flags = Rest.rpartition(' (')
+	if (not s or not t):
+		return None
+	return Point, [f.strip() for f in Flags.rstrip(')').split(',')]
+
+# Class of a mount, from its mount point and flags
+def classify_mount(Point, Flags):
+	if (not 'local' in Flags):
+		r = 'network'
+	elif (Point == '/' or Point.startswith('/System/Volumes/')):
+		r = 'local'
+	elif ('/.timemachine' in Point or 'com.apple.TimeMachine' in Point or isdir(join(Point, 'Backups.backupdb'))):
+		r = 'backup'
+	else:
+		r = 'removable'
+	return r
+
+# Read and classify the mount table
+@timed('mount')
+def read_mounts():
+	r = []
+	for l in execute_command([Mount]).split('\n'):
+		m = parse_mount(l)
+		if (m): r.append([m[0], classify_mount(m[0], m[1])])
+	return r
+
+# Mount points and their classes, from the bundle index while no volume has been mounted or unmounted
+def mounts():
+	with lock:
+		if (not Read):
+			m = cache.mounts(Folder)
+			if (m is None):
+				m = read_mounts()
+				if (m): cache.set_mounts(Folder, m)
+			Mounts.extend(sorted(m, key=lambda a: -len(a[0])))
+			Read.append(True)
+	return Mounts
+
+# Class of the volume a path is on
+def classify(p):
+	for Point, Class in mounts():
+		if (p == Point or p.startswith(Point.rstrip('/') + '/')):
+			return Class
+	return 'local'
+
+# Search results, as (path, value) pairs, on the volumes searched under a Volumes policy
+def searched(Results, policy):
+	r = [(p, v) for p, v in Results if classify(p) in Policies[policy]]
+	return r
+
+# Path is on a volume searched under any policy, so the crawler may crawl it
+def searchable(p):
+	r = classify(p) in Searchable
+	return r
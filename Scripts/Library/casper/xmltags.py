@@ -0,0 +1,66 @@
+"""
+Reads the text of tags from XML files for the XML template.
+Files are scanned with iterparse rather than parsed whole: each element is discarded once it ends, and the scan stops once every requested tag has ended.
+The tags of every product reading the same file are read in one pass, and memoised for the run.
+"""
+
+# Required modules
+from xml.etree.ElementTree import iterparse, parse
+from casper.timing import timed
+
+# Text of tags read, keyed by (Source, Tag)
+Tags = {}
+
+# Tag is a plain element name, rather than an ElementTree path
+def plain(t):
+	r = not any(c in t for c in '/[]*.@')
+	return r
+
+# Read the text of the first element below the root with each tag, in one pass, as find('.//' + Tag) would find it
+def scan_tags(s, tags):
+	Wanted = set(tags)
+	Matches = {}
+	r = {}
+	Open = []
+	try:
+		for event, e in iterparse(s, events=('start', 'end')):
+			if (event == 'start'):
+				# The first match in document order is the first to start
+				if (Open and e.tag in Wanted and not e.tag in Matches): Matches[e.tag] = e
+				Open.append(e)
+				continue
+			Open.pop()
+			if (Matches.get(e.tag) is e):
+				r[e.tag] = e.text or ''
+				if (len(r) == len(Wanted)): break
+			# Discard each element once it ends, so memory is bounded by the nesting depth
+			if (Open): Open[-1].remove(e)
+	except Exception:
+		pass
+	return r
+
+# Read the text of several tags from Source, memoising each
+@timed('read_xml')
+def read_tags(s, tags):
+	tags = [t for t in tags if not (s, t) in Tags]
+	if (len(tags) == 0):
+		return
+	r = scan_tags(s, [t for t in tags if plain(t)])
+	for t in tags:
+		if (plain(t)):
+			Tags[(s, t)] = r.get(t, '')
+		else:
+			Tags[(s, t)] = read_xml_path(s, t)
+
+# Read a tag given as an ElementTree path by parsing the whole file
+def read_xml_path(s, t):
+	try:
+		v = parse(s).getroot().find('.//' + t).text or ''
+	except:
+		v = ''
+	return v
+
+# Read Tag's Value as String from Source
+def read_xml(s, t):
+	read_tags(s, [t])
+	return Tags[(s, t)]
@@ -0,0 +1,56 @@
+#!/usr/bin/python
+
+"""
+Renders the Extension Attribute scripts in Scripts/EA - * and their XML upload files in Extension Attributes from the product manifest and the templates in Scripts/EA - Templates.
+Run after editing the manifest or a template (or after BuildManifest.py, when a script was edited), so a script and its XML file never have to be edited separately.
+The XML files of the packed Extension Attributes in Scripts/EA - Packed are rendered from their scripts too.
+Products are rendered concurrently, and a file is only rewritten when the hash of its content changes, so an unchanged tree is left untouched.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from glob import glob
+from io import open
+from multiprocessing.pool import ThreadPool
+from os.path import abspath, basename, dirname, join
+from sys import path
+from time import time
+Scripts = dirname(dirname(abspath(__file__)))
+path.insert(0, join(Scripts, 'Library'))
+from casper import Manifest
+from casper.attributes import Packed, paths, render_script, render_xml, template_path, update, xml_path
+from casper.products import load
+
+def main():
+	parser = ArgumentParser(description='Renders the Extension Attribute scripts and XML files from the product manifest.')
+	parser.add_argument('--manifest', default=Manifest, help='product manifest to render')
+	parser.add_argument('--workers', type=int, default=8, help='products rendered concurrently')
+	args = parser.parse_args()
+	t = time()
+	Products = load(args.manifest)
+	Templates = {}
+	for p in Products:
+		if (not p['Template'] in Templates):
+			with open(template_path(Scripts, p['Template']), encoding='utf-8') as i:
+				Templates[p['Template']] = i.read()
+	# Render a product's script and XML file, returning the files rewritten
+	def render(p):
+		s = render_script(p, Templates[p['Template']])
+		Script, Xml = paths(Scripts, p)
+		r = [f for f, c in ((Script, s), (Xml, render_xml(p, s))) if update(f, c)]
+		return r
+	pool = ThreadPool(args.workers)
+	Written = [f for r in pool.map(render, Products) for f in r]
+	pool.close()
+	# XML files of the packed Extension Attributes, whose scripts are written by hand
+	for f in sorted(glob(join(Scripts, Packed, '*.py'))):
+		with open(f, encoding='utf-8') as i:
+			s = i.read()
+		Name = basename(f)[:-3]
+		if (update(xml_path(Scripts, Packed, Name), render_xml({'Name': Name}, s))): Written.append(xml_path(Scripts, Packed, Name))
+	for f in sorted(Written):
+		print('rewrote ' + f)
+	print('%d products rendered in %.3fs, %d files rewritten' % (len(Products), time() - t, len(Written)))
+
+if __name__ == '__main__':
+	main()
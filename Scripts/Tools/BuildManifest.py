@@ -0,0 +1,20 @@
+#!/usr/bin/python
+
+"""
+Builds the product manifest for the Casper runtime from the header constants of the Extension Attribute scripts.
+Run after adding or editing a script in Scripts/EA - *, so the runtime evaluates the same products as the scripts define.
+"""
+
+# Required modules
+from os.path import abspath, dirname, join
+from sys import path
+Scripts = dirname(dirname(abspath(__file__)))
+path.insert(0, join(Scripts, 'Library'))
+from casper import Manifest
+from casper.products import read_scripts, write_manifest
+
+def main():
+	write_manifest(read_scripts(Scripts), Manifest)
+
+if __name__ == '__main__':
+	main()
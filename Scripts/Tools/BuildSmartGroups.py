@@ -0,0 +1,72 @@
+#!/usr/bin/python
+
+"""
+Writes smart computer groups matching product results in the packed Extension Attribute (Scripts/EA - Packed), as XML files for the JSS API.
+Each group has one criterion: the packed attribute is like |key=Result| for its product, which matches that product's entry and no other's.
+By default a group is written for every product found Older than its Version, in Smart Groups/Older next to the Extension Attributes folder; other results, a category of products and the attribute's name can be chosen.
+Files are only rewritten when their content changes.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from collections import Counter
+from os.path import abspath, dirname, join
+from sys import exit, path
+from time import time
+Scripts = dirname(dirname(abspath(__file__)))
+path.insert(0, join(Scripts, 'Library'))
+from casper import Manifest
+from casper.attributes import escape, update
+from casper.packed import category, criterion, key
+from casper.products import load
+
+# Smart computer group for the JSS API
+Group = '''<?xml version="1.0" encoding="UTF-8"?>
+<computer_group>
+<name>%s</name>
+<is_smart>true</is_smart>
+<criteria>
+<size>1</size>
+<criterion>
+<name>%s</name>
+<priority>0</priority>
+<and_or>and</and_or>
+<search_type>like</search_type>
+<value>%s</value>
+<opening_paren>false</opening_paren>
+<closing_paren>false</closing_paren>
+</criterion>
+</criteria>
+</computer_group>
+'''
+
+# Render the smart group matching a product's result
+def render_group(p, Result, Attribute):
+	r = Group % (escape(p['Name'] + ' ' + Result), escape(Attribute), escape(criterion(p['Name'], Result)))
+	return r
+
+def main():
+	parser = ArgumentParser(description='Writes smart groups matching product results in the packed Extension Attribute.')
+	parser.add_argument('--manifest', default=Manifest, help='product manifest to write groups for')
+	parser.add_argument('--result', action='append', choices=['Older', 'Equal', 'Newer', 'N/A', 'Error'], help='result to write a group for (repeatable, Older by default)')
+	parser.add_argument('--category', help='write groups for a category of products only (e.g. Bundle)')
+	parser.add_argument('--attribute', default='Packed Inventory', help='name of the packed Extension Attribute in the JSS')
+	parser.add_argument('--output', default=join(dirname(Scripts), 'Smart Groups'), help='folder to write the groups in')
+	args = parser.parse_args()
+	t = time()
+	Products = [p for p in load(args.manifest) if args.category is None or category(p) == args.category]
+	# Products sharing a key can't be told apart in the packed form
+	Shared = [k for k, n in Counter(key(p['Name']) for p in Products).items() if n > 1]
+	if (Shared):
+		exit('Error: products share the packed keys ' + ', '.join(sorted(Shared)))
+	Written = []
+	for Result in args.result or ['Older']:
+		for p in Products:
+			f = join(args.output, Result.replace('/', ''), p['Name'] + '.xml')
+			if (update(f, render_group(p, Result, args.attribute))): Written.append(f)
+	for f in Written:
+		print('rewrote ' + f)
+	print('%d products, %d groups rendered in %.3fs, %d files rewritten' % (len(Products), len(Products) * len(args.result or ['Older']), time() - t, len(Written)))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,101 @@
+#!/usr/bin/python
+
+"""
+Checks every XML upload file in Extension Attributes against its script in Scripts/EA - *, and fails when any have drifted apart.
+The scripts are hashed into an index first; each XML file is then streamed as far as its scriptContentsMac, whose script is decoded, given Unix line endings and hashed.
+Reports XML files whose script differs from theirs (and which script it matches instead, if any), XML files without a script and scripts without an XML file.
+Also reports scripts whose header constants differ from their product in the manifest, and products in the manifest or scripts missing from the other.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from glob import glob
+from hashlib import sha1
+from io import open
+from multiprocessing.pool import ThreadPool
+from os.path import abspath, basename, dirname, join, relpath
+from sys import exit, path
+from time import time
+Scripts = dirname(dirname(abspath(__file__)))
+path.insert(0, join(Scripts, 'Library'))
+from casper import Manifest
+from casper.attributes import Packed, normalise, paths, read_xml_script
+from casper.products import Folders, header_product, load, read_scripts
+
+# Hash of a script, with Unix line endings
+def digest(s):
+	r = sha1(normalise(s).encode('utf-8')).hexdigest()
+	return r
+
+# Key shared by a script and its XML file: the XML file's folder and the name of the attribute
+def key(folder, f):
+	r = (folder, basename(f).rsplit('.', 1)[0])
+	return r
+
+# Index of the hash of every script, keyed by key()
+def index_scripts(root):
+	r = {}
+	for Folder in list(Folders) + [Packed]:
+		for f in glob(join(root, Folder, '*.py')):
+			with open(f, encoding='utf-8') as i:
+				r[key(Folder[len('EA - '):], f)] = digest(i.read())
+	return r
+
+# Hash of the script in an XML file, or None when it has none or can't be parsed
+def hash_xml(f):
+	try:
+		s = read_xml_script(f)
+	except Exception:
+		s = None
+	r = digest(s) if s is not None else None
+	return r
+
+# Problems between the header constants of the scripts and the products in a manifest
+def check_manifest(root, manifest):
+	Headers = dict((p['Name'], p) for p in read_scripts(root))
+	Products = dict((p['Name'], p) for p in load(manifest))
+	r = []
+	for n in sorted(set(Headers) | set(Products)):
+		if (not n in Products):
+			r.append('not in manifest: %s is not in %s (run BuildManifest.py)' % (relpath(paths(root, Headers[n])[0], root), manifest))
+		elif (not n in Headers):
+			r.append('missing script: %s has no %s (run BuildAttributes.py)' % (n, relpath(paths(root, Products[n])[0], root)))
+		elif (header_product(n, Headers[n], Headers[n]['Template']) != Products[n]):
+			r.append('header mismatch: %s differs from %s in %s (run BuildManifest.py or BuildAttributes.py)' % (relpath(paths(root, Headers[n])[0], root), n, manifest))
+	return r
+
+def main():
+	parser = ArgumentParser(description='Checks the Extension Attribute XML files against their scripts.')
+	parser.add_argument('--manifest', default=Manifest, help='product manifest to check the scripts\' header constants against')
+	parser.add_argument('--workers', type=int, default=8, help='XML files read concurrently')
+	args = parser.parse_args()
+	t = time()
+	Index = index_scripts(Scripts)
+	Owners = dict((h, k) for k, h in Index.items())
+	Files = sorted(glob(join(dirname(Scripts), 'Extension Attributes', '*', '*.xml')))
+	pool = ThreadPool(args.workers)
+	Hashes = pool.map(hash_xml, Files)
+	pool.close()
+	Problems = []
+	Paired = set()
+	for f, h in zip(Files, Hashes):
+		k = key(basename(dirname(f)), f)
+		Paired.add(k)
+		if (h is None):
+			Problems.append('unreadable: %s has no scriptContentsMac' % f)
+		elif (not k in Index):
+			Problems.append('missing script: %s has no EA - %s/%s.py' % (f, k[0], k[1]))
+		elif (Index[k] != h):
+			Other = Owners.get(h)
+			Problems.append('mismatch: %s differs from its script%s' % (f, ' (matches EA - %s/%s.py)' % Other if Other else ''))
+	for k in sorted(set(Index) - Paired):
+		Problems.append('missing XML: EA - %s/%s.py has no Extension Attributes/%s/%s.xml' % (k[0], k[1], k[0], k[1]))
+	Problems.extend(check_manifest(Scripts, args.manifest))
+	for e in Problems:
+		print(e)
+	print('%d XML files checked against %d scripts in %.3fs, %d problems' % (len(Files), len(Index), time() - t, len(Problems)))
+	if (Problems):
+		exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+
+"""
+Installs the Casper runtime that the Extension Attribute scripts import, with its bytecode compiled in advance.
+Copies the casper package and Inventory.py from Scripts/Library into /Library/Application Support/Casper (or another folder), replacing any earlier version in one rename, and compiles every module for the interpreter running this script.
+Run it as root with the interpreter the Extension Attributes run under (/usr/bin/python), e.g. from a policy, so no Extension Attribute compiles the runtime during recon.
+The results, bundle index and other files the runtime keeps in the folder are left in place.
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from compileall import compile_dir
+from os import makedirs, rename
+from os.path import abspath, dirname, exists, join
+from shutil import copy2, copytree, ignore_patterns, rmtree
+from sys import exit, path
+Library = join(dirname(dirname(abspath(__file__))), 'Library')
+path.insert(0, Library)
+from casper import Support
+
+def main():
+	parser = ArgumentParser(description='Installs the Casper runtime with precompiled bytecode.')
+	parser.add_argument('--target', default=Support, help='folder to install the runtime in')
+	args = parser.parse_args()
+	if (not exists(args.target)): makedirs(args.target)
+	New = join(args.target, 'casper.new')
+	Old = join(args.target, 'casper.old')
+	for d in (New, Old):
+		if (exists(d)): rmtree(d)
+	copytree(join(Library, 'casper'), New, ignore=ignore_patterns('*.pyc', '__pycache__'))
+	if (not compile_dir(New, quiet=1)):
+		rmtree(New)
+		exit('Error: compiling the runtime failed')
+	# Swap the new package in, so a running Extension Attribute never sees a partial one
+	if (exists(join(args.target, 'casper'))): rename(join(args.target, 'casper'), Old)
+	rename(New, join(args.target, 'casper'))
+	if (exists(Old)): rmtree(Old)
+	copy2(join(Library, 'Inventory.py'), args.target)
+	print('installed the runtime in %s' % args.target)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+
+"""
+Ranks the slowest products, and the phases they spend their time in, across runs timed with CASPER_TIMING.
+Reads any number of JSON lines files and Chrome trace-event files written by the runtime.
+A product's time in a run is its evaluate phase; phase times are inclusive, so a phase includes any phases it calls (e.g. validation includes compare_versions).
+"""
+
+# Required modules
+from argparse import ArgumentParser
+from json import loads
+
+# Read the phases recorded in a timing file, as (run, phase, product, seconds) tuples
+def read_events(f):
+	s = open(f).read()
+	try:
+		d = loads(s)
+	except ValueError:
+		d = None
+	if (isinstance(d, dict) and 'traceEvents' in d):
+		return [(e['args']['run'], e['name'], e['args']['product'], e['dur'] / 1e6) for e in d['traceEvents']]
+	r = []
+	for l in s.splitlines():
+		if (l.strip()):
+			e = loads(l)
+			r.append((e['run'], e['phase'], e['product'], e['seconds']))
+	return r
+
+# Total seconds of each key in each run, keyed by key, then run
+def totals(Events, key):
+	r = {}
+	for e in Events:
+		k = key(e)
+		if (k is None): continue
+		r.setdefault(k, {})
+		r[k][e[0]] = r[k].get(e[0], 0) + e[3]
+	return r
+
+# Print a ranking of totals by their mean over the runs they appear in
+def rank(title, Totals, top):
+	print('%-50s %5s %10s %10s' % (title, 'runs', 'mean ms', 'max ms'))
+	Rows = sorted(((sum(t.values()) / len(t), max(t.values()), len(t), k) for k, t in Totals.items()), reverse=True)
+	for mean, most, runs, k in Rows[:top]:
+		print('%-50s %5d %10.2f %10.2f' % (k, runs, 1000 * mean, 1000 * most))
+
+def main():
+	parser = ArgumentParser(description='Ranks the slowest products and phases across timed runs.')
+	parser.add_argument('files', nargs='+', help='JSON lines or Chrome trace-event files written with CASPER_TIMING')
+	parser.add_argument('--top', type=int, default=20, help='products to list')
+	parser.add_argument('--product', help='break down the phases of one product')
+	args = parser.parse_args()
+	Events = []
+	for f in args.files:
+		Events.extend(read_events(f))
+	print('%d phases recorded in %d runs\n' % (len(Events), len(set(e[0] for e in Events))))
+	if (args.product):
+		rank('Phases of ' + args.product, totals([e for e in Events if e[2] == args.product], lambda e: e[1]), args.top)
+		return
+	rank('Product', totals(Events, lambda e: e[2] if e[1] == 'evaluate' else None), args.top)
+	print('')
+	rank('Phase', totals(Events, lambda e: e[1]), args.top)
+
+if __name__ == '__main__':
+	main()